@@ -4,6 +4,7 @@ Aplicación principal Streamlit con autenticación
 """
 import streamlit as st
 from config import APP_TITLE, APP_ICON
+import re
 import sys
 from pathlib import Path
 
@@ -15,6 +16,44 @@ from services.auth import (
     logout_with_persistence, restore_session_from_cookie
 )
 
+# Patrones de validación compilados una sola vez al importar
+_NAME_RE = re.compile(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s\-]+$')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+def _validate_name(name: str) -> bool:
+    """Valida que el nombre solo contenga letras, espacios y acentos"""
+    if not name or len(name.strip()) < 2:
+        return False
+    return _NAME_RE.match(name.strip()) is not None
+
+
+def _validate_email(email: str) -> bool:
+    """Valida formato de email"""
+    return _EMAIL_RE.match(email) is not None
+
+
+def _validate_ci(ci: str) -> bool:
+    """Valida formato de cédula (solo números, 7-8 dígitos)"""
+    return ci.isdigit() and 7 <= len(ci) <= 8
+
+
+# Áreas de estudio disponibles y su índice precomputado para selectboxes
+_AREA_OPTS = ("radiologia", "medicina", "enfermeria", "otro")
+_AREA_IDX = {a: i for i, a in enumerate(_AREA_OPTS)}
+
+# Patologías del modelo y sus etiquetas traducidas, precomputadas una sola
+# vez (el format_func del selectbox se invoca para cada opción en cada rerun)
+from utils.translations import translate_pathology
+
+_PATHOLOGIES = (
+    "Atelectasis", "Cardiomegaly", "Effusion", "Infiltration",
+    "Mass", "Nodule", "Pneumonia", "Pneumothorax",
+    "Consolidation", "Edema", "Emphysema", "Fibrosis",
+    "Pleural_Thickening", "Hernia"
+)
+_PATHOLOGY_LABELS = {p: f"{translate_pathology(p)} ({p})" for p in _PATHOLOGIES}
+
 
 def main():
     """Función principal de la aplicación"""
@@ -84,6 +123,17 @@ def main():
                 st.session_state.model = model
                 st.session_state.class_names = class_names
                 st.session_state.model_config = config  # Incluye thresholds y gradcam_layer
+
+                # Vocabulario fijo: traducciones y nombres normalizados se
+                # calculan una sola vez por sesión, no en cada análisis
+                from views.analysis_page import _normalize_text
+                class_names_es = tuple(translate_pathology(n) for n in class_names)
+                st.session_state.class_names_es = class_names_es
+                st.session_state.norm_class_names = tuple(
+                    (_normalize_text(en), _normalize_text(es))
+                    for en, es in zip(class_names, class_names_es)
+                )
+
                 st.session_state.model_loaded = True
                 
             except Exception as e:
@@ -170,11 +220,18 @@ def render_home_page():
     # Calcular estadísticas
     total_analyses = len(user_analyses)
     
-    # Precisión promedio (solo de los que tienen verificación)
-    verified_analyses = [a for a in user_analyses if a.get('acerto_toraxia') is not None]
-    if verified_analyses:
-        correct_count = len([a for a in verified_analyses if a.get('acerto_toraxia') == True])
-        precision = (correct_count / len(verified_analyses)) * 100
+    # Precisión promedio (solo de los que tienen verificación) - un solo pase
+    verified_count = 0
+    correct_count = 0
+    for a in user_analyses:
+        acerto = a.get('acerto_toraxia')
+        if acerto is not None:
+            verified_count += 1
+            if acerto:
+                correct_count += 1
+
+    if verified_count:
+        precision = (correct_count / verified_count) * 100
         precision_text = f"{precision:.1f}%"
     else:
         precision_text = "N/A"
@@ -303,9 +360,10 @@ def render_activity_feed():
         st.write("Los análisis se mostrarán aquí cuando los usuarios guarden sus resultados.")
         return
     
-    # Filtrar por área si es necesario
+    # Filtrar por área si es necesario (minúsculas una sola vez, no por fila)
     if area_filter != "Todas":
-        analyses = [a for a in analyses if a.get('academico_area', '').lower() == area_filter.lower()]
+        area_norm = area_filter.lower()
+        analyses = [a for a in analyses if a.get('academico_area', '').lower() == area_norm]
     
     if not analyses:
         st.info(f"📭 No hay análisis del área '{area_filter}' disponibles.")
@@ -449,6 +507,123 @@ def render_profile_page():
     st.info("💡 Para modificar tus datos, contacta al administrador")
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_user_stats() -> tuple:
+    """Cuenta usuarios totales/activos/admin en el servidor (cacheado 60s)"""
+    from services.auth import get_supabase_client
+    supabase = get_supabase_client()
+    total = supabase.table('users').select('id', count='exact', head=True).execute().count or 0
+    active = supabase.table('users').select('id', count='exact', head=True).eq('is_active', True).execute().count or 0
+    admins = supabase.table('users').select('id', count='exact', head=True).eq('role', 'admin').execute().count or 0
+    return total, active, admins
+
+
+# Usuarios por página en la gestión de usuarios
+_USERS_PAGE_SIZE = 25
+
+
+def _format_last_login(last_login) -> str:
+    """Formatea la última conexión de un usuario (dd/mm/aaaa hh:mm)"""
+    from datetime import datetime
+
+    if not last_login:
+        return 'Nunca'
+    try:
+        return datetime.fromisoformat(last_login).strftime("%d/%m/%Y %H:%M")
+    except (ValueError, TypeError):
+        return last_login
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_users(search_term: str, status_filter: str, page: int = 1) -> tuple:
+    """
+    Obtiene una página de usuarios filtrados en el servidor (cacheado 60s).
+
+    Returns:
+        tuple: (lista de usuarios de la página, total de coincidencias)
+    """
+    from services.auth import get_supabase_client
+    supabase = get_supabase_client()
+
+    query = supabase.table('users').select('*', count='exact').order('created_at', desc=True)
+
+    if search_term:
+        # Quitar caracteres con significado especial en el filtro PostgREST
+        term = search_term.replace('%', '').replace(',', '').strip()
+        if term:
+            query = query.or_(
+                f"nombre.ilike.%{term}%,apellido.ilike.%{term}%,"
+                f"email.ilike.%{term}%,ci.ilike.%{term}%"
+            )
+
+    if status_filter == "Activos":
+        query = query.eq('is_active', True)
+    elif status_filter == "Inactivos":
+        query = query.eq('is_active', False)
+
+    # Solo la página pedida: la BD hace el recorte, no Python
+    offset = (page - 1) * _USERS_PAGE_SIZE
+    result = query.range(offset, offset + _USERS_PAGE_SIZE - 1).execute()
+    rows = result.data if result.data else []
+
+    # Formatear la última conexión una sola vez al cargar (y no en cada
+    # rerun de la tarjeta, que repetiría el parseo por usuario)
+    for u in rows:
+        u['_last_login_fmt'] = _format_last_login(u.get('last_login'))
+
+    return rows, (result.count or 0)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_definition_names() -> set:
+    """Obtiene solo los nombres de patologías ya definidas (cacheado 5min)"""
+    from services.auth import get_supabase_client
+    supabase = get_supabase_client()
+    result = supabase.table('pathology_definitions').select('pathology_name').execute()
+    return {d['pathology_name'] for d in (result.data or ())}
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_definition(pathology_name: str) -> dict:
+    """Obtiene la definición completa de una patología (cacheado 5min)"""
+    from services.auth import get_supabase_client
+    supabase = get_supabase_client()
+    result = supabase.table('pathology_definitions')\
+        .select('*')\
+        .eq('pathology_name', pathology_name)\
+        .limit(1)\
+        .execute()
+    return result.data[0] if result.data else {}
+
+
+def _invalidate_definition_caches():
+    """Invalida los caches de definiciones tras una escritura"""
+    _load_definition_names.clear()
+    _load_definition.clear()
+
+
+def _invalidate_user_caches():
+    """Invalida los caches de usuarios tras una escritura"""
+    _load_users.clear()
+    _load_user_stats.clear()
+    st.session_state.pop('admin_user_patches', None)
+
+
+def _patch_cached_user(updated: list):
+    """
+    Aplica la fila retornada por un UPDATE sobre la lista cacheada.
+
+    Supabase retorna la representación actualizada de la fila, así que
+    no hace falta invalidar _load_users y refetchear toda la página:
+    solo se parchea la fila en el próximo render. Los contadores sí se
+    refrescan (son consultas HEAD baratas).
+    """
+    if updated:
+        row = updated[0]
+        st.session_state.setdefault('admin_user_patches', {})[row['id']] = row
+    _load_user_stats.clear()
+
+
 def render_admin_users_page():
     """Página de gestión de usuarios (solo admin)"""
     if not is_admin():
@@ -460,22 +635,17 @@ def render_admin_users_page():
     
     st.markdown("---")
     
-    # Obtener todos los usuarios
+    # Obtener cliente de Supabase
     from services.auth import get_supabase_client
     supabase = get_supabase_client()
-    
+
+    # Estadísticas (conteos en el servidor, cacheados entre reruns)
     try:
-        result = supabase.table('users').select('*').order('created_at', desc=True).execute()
-        users = result.data if result.data else []
+        total_users, active_users, admin_users = _load_user_stats()
     except Exception as e:
         st.error(f"Error al cargar usuarios: {str(e)}")
         return
-    
-    # Estadísticas
-    total_users = len(users)
-    active_users = len([u for u in users if u.get('is_active', True)])
-    admin_users = len([u for u in users if u.get('role') == 'admin'])
-    
+
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("👥 Total Usuarios", total_users)
@@ -485,35 +655,33 @@ def render_admin_users_page():
         st.metric("🔒 Administradores", admin_users)
     with col4:
         st.metric("🎓 Estudiantes", total_users - admin_users)
-    
+
     st.markdown("---")
-    
+
     # Filtros
     col_search, col_filter = st.columns([2, 1])
     with col_search:
         search_term = st.text_input("� Buscar por nombre, email o CI:", key="admin_search")
     with col_filter:
         status_filter = st.selectbox("Estado:", ["Todos", "Activos", "Inactivos"], key="admin_status_filter")
-    
-    # Filtrar usuarios
-    filtered_users = users
-    
-    if search_term:
-        search_lower = search_term.lower()
-        filtered_users = [u for u in filtered_users if 
-            search_lower in u.get('nombre', '').lower() or
-            search_lower in u.get('apellido', '').lower() or
-            search_lower in u.get('email', '').lower() or
-            search_lower in u.get('ci', '').lower()
-        ]
-    
-    if status_filter == "Activos":
-        filtered_users = [u for u in filtered_users if u.get('is_active', True)]
-    elif status_filter == "Inactivos":
-        filtered_users = [u for u in filtered_users if not u.get('is_active', True)]
-    
-    st.caption(f"Mostrando {len(filtered_users)} de {total_users} usuarios")
-    
+
+    # Paginación: solo se renderizan _USERS_PAGE_SIZE cards por rerun
+    page = st.number_input("Página", min_value=1, step=1, key="admin_users_page")
+
+    # Filtrado y recorte en el servidor (PostgREST) + cache entre reruns
+    try:
+        filtered_users, match_count = _load_users(search_term, status_filter, page)
+    except Exception as e:
+        st.error(f"Error al cargar usuarios: {str(e)}")
+        return
+
+    st.caption(f"Mostrando {len(filtered_users)} de {match_count} usuarios encontrados ({total_users} en total)")
+
+    # Aplicar filas actualizadas por toggles recientes sobre la página cacheada
+    patches = st.session_state.get('admin_user_patches')
+    if patches:
+        filtered_users = [patches.get(u['id'], u) for u in filtered_users]
+
     # Tabla de usuarios
     for i, user in enumerate(filtered_users):
         render_user_admin_card(user, i, supabase)
@@ -521,11 +689,6 @@ def render_admin_users_page():
 
 def render_user_admin_card(user: dict, index: int, supabase):
     """Renderiza una card de usuario para administración con edición completa"""
-    from datetime import datetime
-    from services.auth import hash_password
-    import secrets
-    import string
-    
     user_id = user.get('id')
     nombre = user.get('nombre', 'N/A')
     apellido = user.get('apellido', '')
@@ -534,16 +697,9 @@ def render_user_admin_card(user: dict, index: int, supabase):
     role = user.get('role', 'estudiante')
     area = user.get('area_estudio', 'radiologia')
     is_active = user.get('is_active', True)
-    last_login = user.get('last_login', 'Nunca')
-    
-    # Formatear última conexión
-    if last_login and last_login != 'Nunca':
-        try:
-            dt = datetime.fromisoformat(last_login)
-            last_login = dt.strftime("%d/%m/%Y %H:%M")
-        except:
-            pass
-    
+    # Última conexión ya formateada al cargar la página de usuarios
+    last_login = user.get('_last_login_fmt') or _format_last_login(user.get('last_login'))
+
     # Colores según estado
     status_text = "✅ Activo" if is_active else "⚫ Inactivo"
     role_badge = "🔒 Admin" if role == 'admin' else "🎓 Estudiante"
@@ -577,7 +733,8 @@ def render_user_admin_card(user: dict, index: int, supabase):
                 if is_active:
                     if st.button("⚫", key=f"deactivate_{user_id}", help="Desactivar usuario"):
                         try:
-                            supabase.table('users').update({'is_active': False}).eq('id', user_id).execute()
+                            updated = supabase.table('users').update({'is_active': False}).eq('id', user_id).execute().data
+                            _patch_cached_user(updated)
                             st.success(f"Usuario desactivado")
                             st.rerun()
                         except Exception as e:
@@ -585,120 +742,124 @@ def render_user_admin_card(user: dict, index: int, supabase):
                 else:
                     if st.button("✅", key=f"activate_{user_id}", help="Activar usuario"):
                         try:
-                            supabase.table('users').update({'is_active': True}).eq('id', user_id).execute()
+                            updated = supabase.table('users').update({'is_active': True}).eq('id', user_id).execute().data
+                            _patch_cached_user(updated)
                             st.success(f"Usuario activado")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Error: {str(e)}")
         
-        # Formulario de edición expandible
+        # Formulario de edición expandible (fragment: editar no rerenderiza toda la página)
         if st.session_state.get(f"editing_user_{user_id}", False):
-            with st.expander("📝 Editar Usuario", expanded=True):
-                with st.form(key=f"edit_form_{user_id}"):
-                    st.markdown(f"**Editando:** {nombre} {apellido}")
-                    
-                    # Campos editables
-                    col_a, col_b = st.columns(2)
-                    with col_a:
-                        new_nombre = st.text_input("Nombre", value=nombre, key=f"name_{user_id}")
-                        new_email = st.text_input("Email", value=email, key=f"email_{user_id}", 
-                                                  help="⚠️ Cambiar email afecta el login del usuario")
-                        new_role = st.selectbox("Rol", options=["estudiante", "admin"],
-                                               index=0 if role == "estudiante" else 1,
-                                               key=f"role_{user_id}")
-                    
-                    with col_b:
-                        new_apellido = st.text_input("Apellido", value=apellido, key=f"apellido_{user_id}")
-                        new_ci = st.text_input("Cédula", value=ci, key=f"ci_{user_id}")
-                        new_area = st.selectbox("Área de Estudio", 
-                                               options=["radiologia", "medicina", "enfermeria", "otro"],
-                                               index=["radiologia", "medicina", "enfermeria", "otro"].index(area) if area in ["radiologia", "medicina", "enfermeria", "otro"] else 0,
-                                               key=f"area_{user_id}")
-                    
-                    st.markdown("---")
-                    
-                    # Botones de acción
-                    col_save, col_reset, col_cancel = st.columns(3)
-                    
-                    with col_save:
-                        save_btn = st.form_submit_button("💾 Guardar Cambios", type="primary")
-                    
-                    with col_reset:
-                        reset_btn = st.form_submit_button("🔑 Resetear Contraseña")
-                    
-                    with col_cancel:
-                        cancel_btn = st.form_submit_button("❌ Cancelar")
-                    
-                    if save_btn:
-                        # Validaciones
-                        import re
-                        
-                        def validate_name(name):
-                            if not name or len(name.strip()) < 2:
-                                return False
-                            pattern = r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s\-]+$'
-                            return re.match(pattern, name.strip()) is not None
-                            
-                        def validate_email(email):
-                            pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                            return re.match(pattern, email) is not None
-                            
-                        def validate_ci(ci):
-                            return ci.isdigit() and 7 <= len(ci) <= 8
-                        
-                        errors = []
-                        if not validate_name(new_nombre):
-                            errors.append("Nombre inválido (solo letras, sin números ni caracteres especiales)")
-                        
-                        if not validate_name(new_apellido):
-                            errors.append("Apellido inválido (solo letras, sin números ni caracteres especiales)")
-                        
-                        if not validate_email(new_email):
-                            errors.append("Email inválido (formato incorrecto)")
-                            
-                        if not validate_ci(new_ci):
-                            errors.append("Cédula inválida (solo números, 7-8 dígitos)")
-                            
-                        if errors:
-                            for error in errors:
-                                st.error(f"❌ {error}")
-                        else:
-                            try:
-                                # Actualizar datos
-                                updates = {
-                                    'nombre': new_nombre.strip(),
-                                    'apellido': new_apellido.strip(),
-                                    'email': new_email.strip(),
-                                    'ci': new_ci.strip(),
-                                    'area_estudio': new_area,
-                                    'role': new_role
-                                }
-                                supabase.table('users').update(updates).eq('id', user_id).execute()
-                                st.success(f"✅ Usuario actualizado correctamente")
-                                del st.session_state[f"editing_user_{user_id}"]
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"❌ Error al actualizar: {str(e)}")
-                    
-                    if reset_btn:
-                        try:
-                            # Generar contraseña temporal
-                            temp_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(10))
-                            password_hash = hash_password(temp_password)
-                            
-                            supabase.table('users').update({'password_hash': password_hash}).eq('id', user_id).execute()
-                            
-                            st.success(f"✅ Contraseña reseteada")
-                            st.info(f"🔑 **Nueva contraseña temporal:** `{temp_password}`")
-                            st.warning("⚠️ Comparte esta contraseña con el usuario de forma segura. Solo se muestra una vez.")
-                        except Exception as e:
-                            st.error(f"❌ Error al resetear contraseña: {str(e)}")
+            _edit_user_fragment(user, supabase)
+
+        st.markdown("---")
+
+
+@st.fragment
+def _edit_user_fragment(user: dict, supabase):
+    """Formulario de edición de un usuario, aislado en un fragment"""
+    from services.auth import hash_password
+    import secrets
+
+    user_id = user.get('id')
+    nombre = user.get('nombre', 'N/A')
+    apellido = user.get('apellido', '')
+    email = user.get('email', 'N/A')
+    ci = user.get('ci', 'N/A')
+    role = user.get('role', 'estudiante')
+    area = user.get('area_estudio', 'radiologia')
+
+    with st.expander("📝 Editar Usuario", expanded=True):
+        with st.form(key=f"edit_form_{user_id}"):
+            st.markdown(f"**Editando:** {nombre} {apellido}")
+
+            # Campos editables
+            col_a, col_b = st.columns(2)
+            with col_a:
+                new_nombre = st.text_input("Nombre", value=nombre, key=f"name_{user_id}")
+                new_email = st.text_input("Email", value=email, key=f"email_{user_id}",
+                                          help="⚠️ Cambiar email afecta el login del usuario")
+                new_role = st.selectbox("Rol", options=["estudiante", "admin"],
+                                       index=0 if role == "estudiante" else 1,
+                                       key=f"role_{user_id}")
+
+            with col_b:
+                new_apellido = st.text_input("Apellido", value=apellido, key=f"apellido_{user_id}")
+                new_ci = st.text_input("Cédula", value=ci, key=f"ci_{user_id}")
+                new_area = st.selectbox("Área de Estudio",
+                                       options=_AREA_OPTS,
+                                       index=_AREA_IDX.get(area, 0),
+                                       key=f"area_{user_id}")
+
+            st.markdown("---")
+
+            # Botones de acción
+            col_save, col_reset, col_cancel = st.columns(3)
+
+            with col_save:
+                save_btn = st.form_submit_button("💾 Guardar Cambios", type="primary")
+
+            with col_reset:
+                reset_btn = st.form_submit_button("🔑 Resetear Contraseña")
+
+            with col_cancel:
+                cancel_btn = st.form_submit_button("❌ Cancelar")
+
+            if save_btn:
+                # Validaciones (patrones precompilados a nivel de módulo)
+                errors = []
+                if not _validate_name(new_nombre):
+                    errors.append("Nombre inválido (solo letras, sin números ni caracteres especiales)")
+
+                if not _validate_name(new_apellido):
+                    errors.append("Apellido inválido (solo letras, sin números ni caracteres especiales)")
+
+                if not _validate_email(new_email):
+                    errors.append("Email inválido (formato incorrecto)")
+
+                if not _validate_ci(new_ci):
+                    errors.append("Cédula inválida (solo números, 7-8 dígitos)")
                     
-                    if cancel_btn:
+                if errors:
+                    for error in errors:
+                        st.error(f"❌ {error}")
+                else:
+                    try:
+                        # Actualizar datos
+                        updates = {
+                            'nombre': new_nombre.strip(),
+                            'apellido': new_apellido.strip(),
+                            'email': new_email.strip(),
+                            'ci': new_ci.strip(),
+                            'area_estudio': new_area,
+                            'role': new_role
+                        }
+                        supabase.table('users').update(updates).eq('id', user_id).execute()
+                        _invalidate_user_caches()
+                        st.success(f"✅ Usuario actualizado correctamente")
                         del st.session_state[f"editing_user_{user_id}"]
                         st.rerun()
-        
-        st.markdown("---")
+                    except Exception as e:
+                        st.error(f"❌ Error al actualizar: {str(e)}")
+            
+            if reset_btn:
+                try:
+                    # Generar contraseña temporal (una sola llamada a urandom)
+                    temp_password = secrets.token_urlsafe(8)
+                    password_hash = hash_password(temp_password)
+                    
+                    supabase.table('users').update({'password_hash': password_hash}).eq('id', user_id).execute()
+                    
+                    st.success(f"✅ Contraseña reseteada")
+                    st.info(f"🔑 **Nueva contraseña temporal:** `{temp_password}`")
+                    st.warning("⚠️ Comparte esta contraseña con el usuario de forma segura. Solo se muestra una vez.")
+                except Exception as e:
+                    st.error(f"❌ Error al resetear contraseña: {str(e)}")
+            
+            if cancel_btn:
+                del st.session_state[f"editing_user_{user_id}"]
+                st.rerun()
 
 
 def render_admin_definitions_page():
@@ -716,26 +877,18 @@ def render_admin_definitions_page():
     from utils.translations import translate_pathology
     
     supabase = get_supabase_client()
-    
-    # Lista de patologías
-    pathologies = [
-        "Atelectasis", "Cardiomegaly", "Effusion", "Infiltration", 
-        "Mass", "Nodule", "Pneumonia", "Pneumothorax", 
-        "Consolidation", "Edema", "Emphysema", "Fibrosis", 
-        "Pleural_Thickening", "Hernia"
-    ]
-    
-    # Obtener definiciones existentes
+
+    # Obtener solo los nombres definidos (cacheados entre reruns); la fila
+    # completa se pide únicamente para la patología seleccionada
     try:
-        result = supabase.table('pathology_definitions').select('*').execute()
-        definitions = {d['pathology_name']: d for d in result.data} if result.data else {}
+        defined_names = _load_definition_names()
     except Exception as e:
         st.error(f"Error al cargar definiciones: {str(e)}")
-        definitions = {}
-    
+        defined_names = set()
+
     # Estadísticas
-    defined_count = len(definitions)
-    pending_count = len(pathologies) - defined_count
+    defined_count = len(defined_names)
+    pending_count = len(_PATHOLOGIES) - defined_count
     
     col1, col2 = st.columns(2)
     with col1:
@@ -748,8 +901,8 @@ def render_admin_definitions_page():
     # Selector de patología
     selected_pathology = st.selectbox(
         "Selecciona una patología para editar:",
-        pathologies,
-        format_func=lambda x: f"{translate_pathology(x)} ({x})" + (" ✅" if x in definitions else " ⚠️")
+        _PATHOLOGIES,
+        format_func=lambda x: _PATHOLOGY_LABELS[x] + (" ✅" if x in defined_names else " ⚠️")
     )
     
     st.markdown("---")
@@ -757,7 +910,7 @@ def render_admin_definitions_page():
     # Formulario de edición
     st.subheader(f"📝 {translate_pathology(selected_pathology)}")
     
-    current_def = definitions.get(selected_pathology, {})
+    current_def = _load_definition(selected_pathology) if selected_pathology in defined_names else {}
     
     with st.form(key=f"def_form_{selected_pathology}"):
         # Definición técnica
@@ -802,7 +955,7 @@ def render_admin_definitions_page():
                 }
                 
                 # Upsert (insertar o actualizar)
-                if selected_pathology in definitions:
+                if selected_pathology in defined_names:
                     # Actualizar
                     supabase.table('pathology_definitions')\
                         .update(definition_data)\
@@ -815,7 +968,8 @@ def render_admin_definitions_page():
                         .insert(definition_data)\
                         .execute()
                     st.success(f"✅ Definición de '{translate_pathology(selected_pathology)}' creada")
-                
+
+                _invalidate_definition_caches()
                 st.rerun()
                 
             except Exception as e:
@@ -825,7 +979,7 @@ def render_admin_definitions_page():
             st.warning("⚠️ La definición técnica no puede estar vacía")
     
     # Vista previa
-    if selected_pathology in definitions:
+    if selected_pathology in defined_names:
         st.markdown("---")
         st.subheader("👁️ Vista Previa")
         
@@ -833,7 +987,7 @@ def render_admin_definitions_page():
             st.markdown(f"""
             <div style="background: #f0f2f6; padding: 1rem; border-radius: 10px; border-left: 4px solid #1f77b4;">
                 <h4 style="color: #1f77b4; margin-bottom: 0.5rem;">{translate_pathology(selected_pathology)}</h4>
-                <p style="color: #333;">{definitions[selected_pathology].get('technical_definition', 'Sin definición')}</p>
+                <p style="color: #333;">{current_def.get('technical_definition', 'Sin definición')}</p>
             </div>
             """, unsafe_allow_html=True)
 
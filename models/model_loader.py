@@ -6,9 +6,23 @@ Incluye carga de thresholds optimizados por patología
 import streamlit as st
 from tensorflow.keras.models import load_model
 import json
+import time
+import queue
+import threading
+from concurrent.futures import Future
 from pathlib import Path
+import numpy as np
 from config import MODEL_PATH, MODEL_CONFIG_PATH, THRESHOLDS_PATH, GRADCAM_LAYER_NAME
 
+# Microbatching de inferencia: agrupa peticiones concurrentes en un solo
+# model.predict para no serializar usuarios simultáneos de a una imagen
+_BATCH_MAX = 8     # imágenes máximas por lote
+_BATCH_WAIT = 0.02  # segundos de espera para completar un lote
+
+_predict_queue = queue.Queue()
+_worker_lock = threading.Lock()
+_worker_started = False
+
 
 @st.cache_resource
 def load_chestxray_model():
@@ -115,6 +129,66 @@ def load_thresholds():
         raise
 
 
+def _predict_worker(model):
+    """Hilo demonio que drena la cola de inferencia y predice por lotes"""
+    while True:
+        items = [_predict_queue.get()]  # bloquea hasta la primera petición
+
+        # Acumular más peticiones hasta llenar el lote o vencer la espera
+        deadline = time.monotonic() + _BATCH_WAIT
+        while len(items) < _BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(_predict_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            batch = np.concatenate([arr for arr, _ in items], axis=0)
+            preds = model.predict(batch, verbose=0)
+
+            for (_, future), pred in zip(items, preds):
+                future.set_result(pred)
+
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+
+
+def _ensure_worker(model):
+    """Arranca el hilo de inferencia por lotes una sola vez por proceso"""
+    global _worker_started
+    if _worker_started:
+        return
+    with _worker_lock:
+        if not _worker_started:
+            threading.Thread(
+                target=_predict_worker, args=(model,),
+                daemon=True, name="predict-batcher"
+            ).start()
+            _worker_started = True
+
+
+def predict_async(model, img_array) -> Future:
+    """
+    Encola una imagen para inferencia por lotes
+
+    Args:
+        model: Modelo Keras cargado
+        img_array: Array con dimensión batch, shape (1, H, W, 3)
+
+    Returns:
+        Future: se resuelve con el vector de predicciones de la imagen
+    """
+    _ensure_worker(model)
+    future = Future()
+    _predict_queue.put((img_array, future))
+    return future
+
+
 def get_class_names():
     """
     Obtiene solo los nombres de las clases/patologías
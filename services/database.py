@@ -10,30 +10,38 @@ from services.auth import get_supabase_client, get_current_user
 from utils.connectivity import check_internet_connection
 
 
-def save_analysis_to_database(analysis_results: Dict, form_data: Dict) -> Tuple[bool, str]:
+def save_analysis_to_database(analysis_results: Dict, form_data: Dict,
+                              user_id: Optional[str] = None) -> Tuple[bool, str]:
     """
     Guarda un análisis completo en la base de datos Supabase
-    
+
     Args:
         analysis_results: Resultados del análisis (predicciones, imágenes, etc.)
         form_data: Datos del formulario pre-diagnóstico
-    
+        user_id: ID del usuario dueño del análisis. Obligatorio si se llama
+            desde un hilo de trabajo: session_state solo existe en el hilo
+            del script, así que ahí get_current_user() no funciona
+
     Returns:
         Tuple[bool, str]: (éxito, mensaje)
     """
-    
+
     # Verificar conexión a internet
     if not check_internet_connection():
         return False, "No hay conexión a internet. El análisis no se guardó en la base de datos."
-    
+
+    # Resolver el usuario antes del try genérico para que una sesión
+    # ausente dé un mensaje claro y no un error de NoneType
+    if user_id is None:
+        user = get_current_user()
+        if not user:
+            return False, "Sesión no disponible. Inicia sesión de nuevo para guardar el análisis."
+        user_id = user['id']
+
     try:
         # Obtener cliente de Supabase
         supabase = get_supabase_client()
         
-        # Obtener usuario actual
-        user = get_current_user()
-        user_id = user['id']
-        
         # Preparar predicciones como JSON
         predictions = analysis_results['predictions']
         class_names = analysis_results['class_names']
@@ -122,6 +130,8 @@ def save_analysis_to_database(analysis_results: Dict, form_data: Dict) -> Tuple[
         result = supabase.table('analyses').insert(analysis_data).execute()
         
         if result.data:
+            # El historial cacheado quedó desactualizado
+            get_user_analyses.clear()
             images_msg = " con imágenes 📷" if original_url else " (sin imágenes)"
             return True, f"✅ Análisis guardado exitosamente{images_msg} (ID: {result.data[0]['id'][:8]}...)"
         else:
@@ -166,27 +176,51 @@ def calculate_accuracy(pronostico_real: str, top_prediction: str) -> bool:
             top_pred_es_norm in pronostico_norm)
 
 
-def get_user_analyses(user_id: str, limit: int = 20) -> list:
+@st.cache_data(ttl=60, show_spinner=False)
+def get_user_analyses(user_id: str, limit: int = 20, offset: int = 0,
+                      search_ci: Optional[str] = None) -> list:
     """
-    Obtiene los análisis de un usuario específico
-    
+    Obtiene una página de análisis de un usuario específico (cacheada 60s;
+    la clave incluye usuario, página y filtro). Las mutaciones deben llamar
+    get_user_analyses.clear()
+
+    Solo trae las columnas de la vista de lista; el resto (predicciones,
+    comentarios, URLs de imágenes) se pide con get_analysis_detail al
+    abrir una card.
+
+    El orden y el recorte los hace la BD; para que sea un index-range-scan
+    la tabla necesita el índice compuesto (creado en Supabase):
+        CREATE INDEX idx_analyses_user_ts ON analyses (user_id, timestamp DESC);
+
     Args:
         user_id: ID del usuario
         limit: Número máximo de análisis a retornar
-    
+        offset: Desplazamiento para paginación (la BD hace el recorte)
+        search_ci: Si se indica, filtra por cédula del paciente en la BD
+
     Returns:
         Lista de análisis ordenados por fecha (más reciente primero)
     """
     try:
         supabase = get_supabase_client()
-        
-        result = supabase.table('analyses')\
-            .select('*')\
-            .eq('user_id', user_id)\
+
+        query = supabase.table('analyses')\
+            .select('id,timestamp,paciente_nombre,paciente_apellido,'
+                    'paciente_ci,paciente_edad,paciente_sexo,'
+                    'top_prediction,top_probability,acerto_toraxia')\
+            .eq('user_id', user_id)
+
+        if search_ci:
+            # Filtrar en la BD: busca en todo el historial, no solo en la página
+            term = search_ci.replace('%', '').replace(',', '').strip()
+            if term:
+                query = query.ilike('paciente_ci', f'%{term}%')
+
+        result = query\
             .order('timestamp', desc=True)\
-            .limit(limit)\
+            .range(offset, offset + limit - 1)\
             .execute()
-        
+
         return result.data if result.data else []
         
     except Exception as e:
@@ -194,6 +228,36 @@ def get_user_analyses(user_id: str, limit: int = 20) -> list:
         return []
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def get_analysis_detail(analysis_id: str) -> Optional[dict]:
+    """
+    Obtiene la fila completa de un análisis (columnas pesadas incluidas).
+
+    Se llama solo al abrir una card del historial; cacheada 60s por id.
+    Las mutaciones deben llamar get_analysis_detail.clear()
+
+    Args:
+        analysis_id: ID del análisis
+
+    Returns:
+        Diccionario con todos los campos del análisis, o None si falla
+    """
+    try:
+        supabase = get_supabase_client()
+
+        result = supabase.table('analyses')\
+            .select('*')\
+            .eq('id', analysis_id)\
+            .limit(1)\
+            .execute()
+
+        return result.data[0] if result.data else None
+
+    except Exception as e:
+        st.error(f"Error al obtener el análisis: {str(e)}")
+        return None
+
+
 def get_recent_public_analyses(limit: int = 20) -> list:
     """
     Obtiene los análisis públicos más recientes (para Actividad Reciente)
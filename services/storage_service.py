@@ -58,7 +58,7 @@ def upload_image_to_storage(
     Sube una imagen a Supabase Storage.
     
     Args:
-        image_data: Imagen como numpy array (RGB o grayscale)
+        image_data: Imagen como numpy array (RGB o grayscale) o bytes JPEG ya codificados
         filename: Nombre del archivo (sin extensión)
         folder: Carpeta dentro del bucket ("originals" o "overlays")
     
@@ -75,27 +75,31 @@ def upload_image_to_storage(
         # Asegurar que el bucket existe
         ensure_bucket_exists()
         
-        # Convertir numpy array a bytes JPEG
-        if len(image_data.shape) == 2:
-            # Grayscale a RGB
-            image_data = cv2.cvtColor(image_data, cv2.COLOR_GRAY2RGB)
-        elif image_data.shape[2] == 4:
-            # RGBA a RGB
-            image_data = cv2.cvtColor(image_data, cv2.COLOR_RGBA2RGB)
-        
-        # Si la imagen está normalizada (0-1), escalar a 0-255
-        if image_data.max() <= 1.0:
-            image_data = (image_data * 255).astype(np.uint8)
+        if isinstance(image_data, (bytes, bytearray)):
+            # Ya viene codificada como JPEG: subir tal cual, sin recomprimir
+            image_bytes = bytes(image_data)
         else:
-            image_data = image_data.astype(np.uint8)
-        
-        # Convertir a PIL Image y luego a bytes
-        pil_image = Image.fromarray(image_data)
-        
-        # Comprimir como JPEG para ahorrar espacio
-        buffer = io.BytesIO()
-        pil_image.save(buffer, format="JPEG", quality=85, optimize=True)
-        image_bytes = buffer.getvalue()
+            # Convertir numpy array a bytes JPEG
+            if len(image_data.shape) == 2:
+                # Grayscale a RGB
+                image_data = cv2.cvtColor(image_data, cv2.COLOR_GRAY2RGB)
+            elif image_data.shape[2] == 4:
+                # RGBA a RGB
+                image_data = cv2.cvtColor(image_data, cv2.COLOR_RGBA2RGB)
+
+            # Si la imagen está normalizada (0-1), escalar a 0-255
+            if image_data.max() <= 1.0:
+                image_data = (image_data * 255).astype(np.uint8)
+            else:
+                image_data = image_data.astype(np.uint8)
+
+            # Convertir a PIL Image y luego a bytes
+            pil_image = Image.fromarray(image_data)
+
+            # Comprimir como JPEG para ahorrar espacio
+            buffer = io.BytesIO()
+            pil_image.save(buffer, format="JPEG", quality=85, optimize=True)
+            image_bytes = buffer.getvalue()
         
         # Path completo en el bucket
         file_path = f"{folder}/{filename}.jpg"
@@ -5,15 +5,122 @@ Genera reportes profesionales en PDF con ReportLab
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import numpy as np
 from PIL import Image
 import io
 
+# Resolución final de las imágenes en el reporte (2.5 pulgadas a 72dpi)
+_PDF_IMG_SIZE = (180, 180)
+
+# Logo de ToraxIA, resuelto una sola vez al importar (evita un stat por reporte)
+_LOGO_PATH = Path(__file__).parent.parent / "toraxia_logo" / "toraxia-high-resolution-logo-transparent.png"
+_LOGO_PATH_STR = str(_LOGO_PATH) if _LOGO_PATH.exists() else None
+
+# Estilo de la tabla de probabilidades, construido una sola vez al importar
+_PROB_TABLE_STYLE = TableStyle([
+    # Header
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('PADDING', (0, 0), (-1, 0), 8),
+
+    # Body
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 1), (1, -1), 'RIGHT'),
+    ('ALIGN', (2, 1), (2, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
+    ('PADDING', (0, 1), (-1, -1), 6),
+])
+
+# Pool para codificar las dos imágenes del reporte en paralelo
+# (PIL libera el GIL dentro del encoder)
+_IMG_POOL = ThreadPoolExecutor(max_workers=2)
+
+
+def _format_timestamp(timestamp: str) -> str:
+    """
+    Formatea un timestamp ISO como 'dd/mm/YYYY HH:MM:SS'.
+
+    Los timestamps vienen de datetime.now().isoformat(), así que el caso
+    común se resuelve con slicing directo sin pasar por fromisoformat.
+
+    Args:
+        timestamp: Timestamp en formato ISO 8601
+
+    Returns:
+        str: Fecha formateada, o el timestamp original si no se pudo parsear
+    """
+    # Fast path: 'YYYY-MM-DDTHH:MM:SS...' con separadores en posición fija
+    if len(timestamp) >= 19 and timestamp[4] == '-' and timestamp[7] == '-' and timestamp[10] in 'T ':
+        return f"{timestamp[8:10]}/{timestamp[5:7]}/{timestamp[0:4]} {timestamp[11:19]}"
+
+    try:
+        return datetime.fromisoformat(timestamp).strftime("%d/%m/%Y %H:%M:%S")
+    except:
+        return timestamp
+
+
+def _scale_to_uint8(img_array):
+    """
+    Escala un array float [0,1] a uint8 minimizando temporales.
+
+    Multiplica en float32 (la mitad de bytes que el float64 implícito),
+    recorta in-place y castea una sola vez.
+
+    Args:
+        img_array: Array numpy float en rango [0, 1]
+
+    Returns:
+        np.ndarray: Array uint8 en rango [0, 255]
+    """
+    scaled = np.multiply(img_array, 255.0, dtype=np.float32)
+    np.clip(scaled, 0.0, 255.0, out=scaled)
+    return scaled.astype(np.uint8)
+
+
+def _encode_image(img_array):
+    """
+    Convierte un array de imagen a un BytesIO JPEG a resolución de render.
+
+    Args:
+        img_array: Array numpy de la imagen (float [0,1] o uint8),
+            bytes de una imagen ya codificada, o una imagen PIL
+
+    Returns:
+        io.BytesIO: Buffer JPEG listo para ReportLab
+    """
+    if isinstance(img_array, (bytes, bytearray)):
+        pil_img = Image.open(io.BytesIO(img_array))
+    elif isinstance(img_array, Image.Image):
+        pil_img = img_array
+    else:
+        if img_array.max() <= 1.0:
+            img_array = _scale_to_uint8(img_array)
+        else:
+            img_array = img_array.astype(np.uint8)
+        pil_img = Image.fromarray(img_array)
+    if pil_img.mode not in ('RGB', 'L'):
+        pil_img = pil_img.convert('RGB')
+
+    # Reducir a la resolución final de render (2.5in a 72dpi ≈ 180px)
+    # y codificar como JPEG: menos bytes por el encoder y en el PDF
+    pil_img = pil_img.resize(_PDF_IMG_SIZE, Image.BILINEAR)
+    buffer = io.BytesIO()
+    pil_img.save(buffer, format='JPEG', quality=90)
+    buffer.seek(0)
+    return buffer
+
 
 def generate_report(analysis_data, output_path=None):
     """
@@ -108,10 +215,8 @@ def generate_report(analysis_data, output_path=None):
     
     # === HEADER CON LOGO ===
     # Agregar logo de ToraxIA
-    from pathlib import Path
-    logo_path = Path(__file__).parent.parent / "toraxia_logo" / "toraxia-high-resolution-logo-transparent.png"
-    if logo_path.exists():
-        logo_img = RLImage(str(logo_path), width=3*inch, height=0.75*inch)
+    if _LOGO_PATH_STR:
+        logo_img = RLImage(_LOGO_PATH_STR, width=3*inch, height=0.75*inch)
         logo_table = Table([[logo_img]], colWidths=[6*inch])
         logo_table.setStyle(TableStyle([
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -127,12 +232,9 @@ def generate_report(analysis_data, output_path=None):
     analysis_id = analysis_data.get('analysis_id', 'N/A')
     timestamp = analysis_data.get('timestamp', datetime.now().isoformat())
     
-    try:
-        dt = datetime.fromisoformat(timestamp)
-        formatted_date = dt.strftime("%d/%m/%Y %H:%M:%S")
-    except:
-        formatted_date = timestamp
-    
+    # Formatear una sola vez; se reutiliza en la tabla de info y en el footer
+    formatted_date = _format_timestamp(timestamp)
+
     info_data = [
         ['ID de Análisis:', analysis_id],
         ['Fecha y Hora:', formatted_date],
@@ -160,42 +262,20 @@ def generate_report(analysis_data, output_path=None):
     overlay_img = analysis_data.get('overlay')
     
     images_row = []
-    
-    if original_img is not None:
-        # Convertir array a imagen PIL
-        if original_img.max() <= 1.0:
-            original_img = (original_img * 255).astype(np.uint8)
-        else:
-            original_img = original_img.astype(np.uint8)
-        
-        pil_img = Image.fromarray(original_img)
-        
-        # Guardar en buffer
-        img_buffer = io.BytesIO()
-        pil_img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        # Crear imagen ReportLab
-        rl_img = RLImage(img_buffer, width=2.5*inch, height=2.5*inch)
-        images_row.append(rl_img)
-    
-    if overlay_img is not None:
-        # Convertir array a imagen PIL
-        if overlay_img.max() <= 1.0:
-            overlay_img = (overlay_img * 255).astype(np.uint8)
-        else:
-            overlay_img = overlay_img.astype(np.uint8)
-        
-        pil_overlay = Image.fromarray(overlay_img)
-        
-        # Guardar en buffer
-        overlay_buffer = io.BytesIO()
-        pil_overlay.save(overlay_buffer, format='PNG')
-        overlay_buffer.seek(0)
-        
-        # Crear imagen ReportLab
-        rl_overlay = RLImage(overlay_buffer, width=2.5*inch, height=2.5*inch)
-        images_row.append(rl_overlay)
+
+    if original_img is not None and overlay_img is not None:
+        # Codificar ambas imágenes en paralelo (trabajo independiente de PIL)
+        futures = [_IMG_POOL.submit(_encode_image, original_img),
+                   _IMG_POOL.submit(_encode_image, overlay_img)]
+        buffers = [f.result() for f in futures]
+    else:
+        # Caso de una sola imagen: llamada directa, sin pool
+        buffers = [_encode_image(img)
+                   for img in (original_img, overlay_img) if img is not None]
+
+    # Ojo: no reutilizar el nombre 'buffer', que es el BytesIO del documento
+    for img_buffer in buffers:
+        images_row.append(RLImage(img_buffer, width=2.5*inch, height=2.5*inch))
     
     if images_row:
         images_table = Table([images_row], colWidths=[3*inch, 3*inch])
@@ -263,39 +343,28 @@ def generate_report(analysis_data, output_path=None):
         else:
             return "MUY ALTO"
     
-    # Ordenar por probabilidad
-    sorted_indices = np.argsort(predictions)[::-1]
-    
-    # Crear tabla con columna de Nivel
+    # Ordenar por probabilidad (gather vectorizado: nombres y probabilidades en un solo paso)
+    predictions_arr = np.asarray(predictions)
+    order = np.argsort(predictions_arr)[::-1]
+    sorted_names = np.asarray(class_names, dtype=object)[order]
+    sorted_probs = predictions_arr[order]
+
+    # Crear tabla con columna de Nivel (un solo pase en Python)
     table_data = [['Patología', 'Probabilidad', 'Nivel']]
+    table_data.extend(
+        [name, f"{prob*100:.2f}%", get_risk_level_text(prob)]
+        for name, prob in zip(sorted_names.tolist(), sorted_probs.tolist())
+    )
     
-    for idx in sorted_indices:
-        prob = predictions[idx]
-        name = class_names[idx]
-        level = get_risk_level_text(prob)
-        table_data.append([name, f"{prob*100:.2f}%", level])
-    
-    prob_table = Table(table_data, colWidths=[3.5*inch, 1.5*inch, 1.3*inch])
-    prob_table.setStyle(TableStyle([
-        # Header
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('PADDING', (0, 0), (-1, 0), 8),
-        
-        # Body
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 1), (1, -1), 'RIGHT'),
-        ('ALIGN', (2, 1), (2, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
-        ('PADDING', (0, 1), (-1, -1), 6),
-    ]))
-    
+    # LongTable con repeatRows: el estilo precompilado se pasa al constructor
+    # y el header se repite si la lista de clases crece a más de una página
+    prob_table = LongTable(
+        table_data,
+        colWidths=[3.5*inch, 1.5*inch, 1.3*inch],
+        repeatRows=1,
+        style=_PROB_TABLE_STYLE
+    )
+
     story.append(prob_table)
     story.append(Spacer(1, 0.4*inch))
     
@@ -332,9 +401,8 @@ def generate_report(analysis_data, output_path=None):
     
     # Retornar bytes según el modo
     if output_path is None:
-        # Modo en memoria - retornar desde buffer
-        buffer.seek(0)
-        return buffer.getvalue()
+        # Modo en memoria - una sola copia desde el buffer (getvalue() copiaría dos veces)
+        return bytes(buffer.getbuffer())
     else:
         # Modo archivo - leer y retornar
         with open(output_path, 'rb') as f:
@@ -35,6 +35,22 @@ def validate_image(file) -> bool:
         return False
 
 
+def validate_image_pil(image: Image.Image) -> bool:
+    """
+    Valida una imagen ya abierta con PIL sin releer sus bytes
+
+    Args:
+        image: Imagen PIL (abierta en modo perezoso)
+
+    Returns:
+        bool: True si el formato es PNG/JPEG, False en caso contrario
+    """
+    try:
+        return (image.format or '').upper() in ('PNG', 'JPEG', 'JPG')
+    except Exception:
+        return False
+
+
 def image_to_array(image: Image.Image) -> np.ndarray:
     """
     Convierte PIL Image a numpy array
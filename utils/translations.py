@@ -1,6 +1,7 @@
 """
 Utilidades para traducción de nombres de patologías
 """
+import functools
 
 # Diccionario de traducción Inglés -> Español
 PATHOLOGY_TRANSLATIONS = {
@@ -20,10 +21,24 @@ PATHOLOGY_TRANSLATIONS = {
     'Hernia': 'Hernia'
 }
 
-# Diccionario inverso Español -> Inglés (para búsquedas)
-PATHOLOGY_TRANSLATIONS_REVERSE = {v: k for k, v in PATHOLOGY_TRANSLATIONS.items()}
+def _reverse_translations() -> dict:
+    """Construye (una sola vez) el diccionario inverso Español -> Inglés"""
+    reverse = globals().get('PATHOLOGY_TRANSLATIONS_REVERSE')
+    if reverse is None:
+        reverse = {v: k for k, v in PATHOLOGY_TRANSLATIONS.items()}
+        globals()['PATHOLOGY_TRANSLATIONS_REVERSE'] = reverse
+    return reverse
 
 
+def __getattr__(name):
+    # Diccionario inverso Español -> Inglés (para búsquedas), construido
+    # de forma perezosa para no pagar el costo en cada import (PEP 562)
+    if name == 'PATHOLOGY_TRANSLATIONS_REVERSE':
+        return _reverse_translations()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.lru_cache(maxsize=256)
 def translate_pathology(pathology_name: str, to_spanish: bool = True) -> str:
     """
     Traduce el nombre de una patología entre inglés y español
@@ -38,7 +53,7 @@ def translate_pathology(pathology_name: str, to_spanish: bool = True) -> str:
     if to_spanish:
         return PATHOLOGY_TRANSLATIONS.get(pathology_name, pathology_name)
     else:
-        return PATHOLOGY_TRANSLATIONS_REVERSE.get(pathology_name, pathology_name)
+        return _reverse_translations().get(pathology_name, pathology_name)
 
 
 def get_all_pathologies_spanish() -> list:
@@ -5,16 +5,117 @@ Maneja el flujo completo: Formulario → Upload → Análisis → Resultados →
 import streamlit as st
 from PIL import Image
 import numpy as np
+import io
+import re
 import uuid
+import time
+import hashlib
+import functools
+import traceback
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import unicodedata
 
-from models.model_loader import load_chestxray_model, get_class_names
-from utils.preprocessing import validate_image, preprocess_image, preprocess_for_display
+from models.model_loader import load_chestxray_model, get_class_names, predict_async
+from utils.preprocessing import validate_image_pil, preprocess_image, preprocess_for_display
 from utils.activation_maps import generate_activation_map_for_top_prediction
 from utils.translations import translate_pathology
 from services.auth import get_current_user
 
+# Pool compartido para el guardado en segundo plano
+_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# Patrones del formulario pre-diagnóstico, compilados una sola vez
+_NAME_RE = re.compile(r'[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s\-]+')
+_CI_RE = re.compile(r'\d{7,8}')
+_AGE_RE = re.compile(r'\d{1,3}')
+_WEIGHT_RE = re.compile(r'\d{1,3}(?:\.\d+)?')
+
+
+def _to_jpeg_bytes(img_array) -> bytes:
+    """Codifica un array de imagen como JPEG para guardarlo en session_state.
+
+    Streamlit serializa session_state en cada rerun; los bytes JPEG pesan
+    ~10-20x menos que el array crudo y st.image los acepta directamente.
+    """
+    buf = io.BytesIO()
+    Image.fromarray(img_array).save(buf, format='JPEG', quality=85)
+    return buf.getvalue()
+
+
+def _top_k_indices(predictions, k: int = 5):
+    """Índices de las k predicciones más altas, de mayor a menor.
+
+    argpartition es O(N) frente al O(N log N) del argsort completo; solo
+    se ordenan los k elementos seleccionados.
+    """
+    k = min(k, len(predictions))
+    part = np.argpartition(predictions, -k)[-k:]
+    return part[np.argsort(predictions[part])[::-1]]
+
+
+@functools.lru_cache(maxsize=512)
+def _normalize_text(text: str) -> str:
+    """Normaliza texto: quita acentos, convierte a minúsculas, quita espacios"""
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
+    return text.lower().replace(' ', '').replace('_', '').replace('-', '')
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _preproc_array(img_hash: str, _image):
+    """Array preprocesado para el modelo, cacheado por hash del archivo"""
+    return preprocess_image(_image)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _display_array(img_hash: str, _image):
+    """Array de visualización, cacheado por hash del archivo"""
+    return preprocess_for_display(_image)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_predict(img_hash: str, _model, _img_array):
+    """Predicción del modelo cacheada por hash del archivo subido.
+
+    Los argumentos con guion bajo no se hashean (el hash del contenido
+    ya identifica la entrada); re-analizar la misma radiografía evita
+    el forward pass completo. La inferencia pasa por el microbatcher
+    del model_loader para agrupar usuarios concurrentes.
+    """
+    return predict_async(_model, _img_array).result()
+
+
+@st.cache_data(max_entries=8, show_spinner="Generando PDF...")
+def _build_pdf(analysis_id: str, _results) -> bytes:
+    """Genera el reporte PDF de un análisis (una sola vez por analysis_id)"""
+    from utils.pdf_generator import generate_report
+    from config import REPORTS_DIR
+
+    return generate_report(_results, REPORTS_DIR / f"{analysis_id}_report.pdf")
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _preprocessed_array(analysis_id: str, _original_image):
+    """Reconstruye el array preprocesado desde la imagen original (cacheado).
+
+    Evita guardar el array float32 completo en session_state, que
+    Streamlit serializa en cada rerun aunque nunca se use.
+    """
+    if isinstance(_original_image, (bytes, bytearray)):
+        img = Image.open(io.BytesIO(_original_image))
+    else:
+        img = Image.fromarray(_original_image)
+    return preprocess_image(img)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _cached_activation_map(img_hash: str, _model, _img_array, _predictions, class_names):
+    """Grad-CAM del Top-1 cacheado por hash del archivo subido"""
+    return generate_activation_map_for_top_prediction(
+        _model, _img_array, _predictions, class_names
+    )
+
 
 def render_analysis_page():
     """Página de nuevo análisis con formulario pre-diagnóstico"""
@@ -34,10 +135,18 @@ def render_analysis_page():
     
     # PASO 2: UPLOAD Y ANÁLISIS
     st.success("✅ Formulario completado")
-    
+
+    # Enlazar session_state a locales una sola vez: cada acceso por
+    # atributo pasa por el proxy de Streamlit y se repite en cada rerun
+    ss = st.session_state
+    form_data = ss.form_data
+    model = ss.get('model')
+    class_names = ss.get('class_names')
+    config = ss.get('model_config', {})
+    thresholds = config.get('thresholds', {})
+
     # Mostrar resumen del formulario
     with st.expander("📋 Ver datos del formulario", expanded=False):
-        form_data = st.session_state.form_data
         col1, col2 = st.columns(2)
         
         with col1:
@@ -83,14 +192,18 @@ def render_analysis_page():
         st.info("👆 Sube una imagen para comenzar el análisis")
         return
     
-    # Validar imagen
-    if not validate_image(uploaded_file):
-        st.error("❌ Formato de archivo no válido. Por favor sube una imagen PNG, JPG o JPEG.")
-        return
-    
-    # Cargar imagen
+    # Cargar y validar imagen (apertura perezosa: PIL solo lee la cabecera,
+    # sin duplicar los bytes del archivo subido)
     try:
+        uploaded_file.seek(0)
         image = Image.open(uploaded_file)
+
+        if not validate_image_pil(image):
+            st.error("❌ Formato de archivo no válido. Por favor sube una imagen PNG, JPG o JPEG.")
+            return
+
+        # Hash del contenido: clave de las cachés de predicción/Grad-CAM
+        img_hash = hashlib.blake2b(uploaded_file.getvalue(), digest_size=16).hexdigest()
     except Exception as e:
         st.error(f"❌ Error al cargar la imagen: {str(e)}")
         return
@@ -114,13 +227,6 @@ def render_analysis_page():
     
     # Botón de análisis
     if st.button("🔬 Analizar Radiografía", type="primary", width="content"):
-        
-        # Obtener modelo precargado
-        model = st.session_state.model
-        class_names = st.session_state.class_names
-        config = st.session_state.get('model_config', {})
-        thresholds = config.get('thresholds', {})
-        
         # Contenedor de progreso
         progress_container = st.empty()
         
@@ -128,48 +234,71 @@ def render_analysis_page():
             # Paso 1: Preprocesar
             progress_container.info("⏳ **Paso 1/2**: Preprocesando imagen...")
             
-            img_array = preprocess_image(image)
-            img_display = preprocess_for_display(image)
+            img_array = _preproc_array(img_hash, image)
+            img_display = _display_array(img_hash, image)
             
             progress_container.success("✅ Imagen preprocesada")
             
             # Paso 2: Predicción + Grad-CAM
             progress_container.info("⏳ **Paso 2/2**: Generando predicciones y Grad-CAM...")
             
-            predictions = model.predict(img_array, verbose=0)[0]
-            
-            heatmap, overlay, top_class_name, top_prob = generate_activation_map_for_top_prediction(
-                model, img_array, predictions, class_names
+            predictions = _cached_predict(img_hash, model, img_array)
+
+            heatmap, overlay, top_class_name, top_prob = _cached_activation_map(
+                img_hash, model, img_array, predictions, class_names
             )
             
-            # Guardar en session_state (incluir thresholds e img_array para Grad-CAM adicional)
-            st.session_state.analysis_results = {
+            # Traducciones y normalizaciones precomputadas al cargar el
+            # modelo (vocabulario fijo); fallback por si la sesión es vieja
+            class_names_es = ss.get('class_names_es') or \
+                [translate_pathology(n) for n in class_names]
+            norm_names = ss.get('norm_class_names') or [
+                (_normalize_text(en), _normalize_text(es))
+                for en, es in zip(class_names, class_names_es)
+            ]
+
+            top_5_indices = _top_k_indices(predictions)
+            analysis_id = uuid.uuid4().hex
+
+            # Guardar en session_state (el array preprocesado NO se incluye:
+            # se reconstruye bajo demanda para el Grad-CAM adicional)
+            ss.analysis_results = {
                 'predictions': predictions,
                 'class_names': class_names,
+                'class_names_es': class_names_es,
+                'norm_names': norm_names,
+                'top_5_indices': top_5_indices,
                 'top_class': top_class_name,
                 'top_prob': top_prob,
-                'overlay': overlay,
-                'original_image': img_display,
+                'overlay': _to_jpeg_bytes(overlay),
+                'original_image': _to_jpeg_bytes(img_display),
                 'timestamp': datetime.now().isoformat(),
-                'analysis_id': uuid.uuid4().hex,
-                'form_data': st.session_state.form_data,  # Incluir datos del formulario
-                'thresholds': thresholds,  # Thresholds optimizados
-                'img_array': img_array  # Para generar Grad-CAM de otras clases
+                'analysis_id': analysis_id,
+                'form_data': form_data,  # Incluir datos del formulario
+                'thresholds': thresholds  # Thresholds optimizados
             }
-            
+
+            # Pre-calcular en segundo plano los Grad-CAM del Top 2-5
+            # mientras el usuario lee el Top 1; al hacer clic ya están listos
+            gradcam_cache = ss.setdefault('gradcam_cache', {})
+            _EXECUTOR.submit(
+                _precompute_extra_gradcams,
+                gradcam_cache, analysis_id, model, img_array,
+                top_5_indices[1:], class_names
+            )
+
             progress_container.success("✅ ¡Análisis completado exitosamente!")
             
         except Exception as e:
             progress_container.error(f"❌ Error durante el análisis: {str(e)}")
             st.code(f"Detalles del error:\n{str(e)}")
-            import traceback
             with st.expander("Ver traceback completo"):
                 st.code(traceback.format_exc())
             return
     
     # Mostrar resultados si existen
-    if 'analysis_results' in st.session_state:
-        show_results(st.session_state.analysis_results)
+    if 'analysis_results' in ss:
+        show_results(ss.analysis_results)
 
 
 def render_pre_diagnosis_form(user):
@@ -305,17 +434,14 @@ def render_pre_diagnosis_form(user):
         )
         
         if submitted:
-            # Validaciones
+            # Validaciones (patrones precompilados a nivel de módulo)
             errors = []
-            
-            # Función para validar nombres (letras, espacios, acentos, guiones)
-            import re
+
             def validate_name(name):
                 if not name or len(name.strip()) < 2:
                     return False
-                pattern = r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s\-]+$'
-                return re.match(pattern, name.strip()) is not None
-            
+                return _NAME_RE.fullmatch(name.strip()) is not None
+
             # Validar nombres (solo letras, espacios, acentos y guiones)
             if not paciente_nombre or not paciente_apellido:
                 errors.append("El nombre y apellido del paciente son obligatorios")
@@ -328,29 +454,27 @@ def render_pre_diagnosis_form(user):
             # Validar cédula (solo números, 7-8 dígitos)
             if not paciente_ci:
                 errors.append("La cédula del paciente es obligatoria")
-            elif not paciente_ci.isdigit():
-                errors.append("La cédula del paciente debe contener solo números")
-            elif len(paciente_ci) < 7 or len(paciente_ci) > 8:
-                errors.append("La cédula debe tener entre 7 y 8 dígitos")
-            
+            elif _CI_RE.fullmatch(paciente_ci) is None:
+                errors.append("La cédula debe contener solo números, entre 7 y 8 dígitos")
+
             # Validar edad (ahora es text_input)
             if not paciente_edad:
                 errors.append("La edad es obligatoria")
-            elif not paciente_edad.isdigit():
+            elif _AGE_RE.fullmatch(paciente_edad) is None:
                 errors.append("La edad debe ser un número")
             else:
                 edad_num = int(paciente_edad)
                 if edad_num < 8 or edad_num > 120:
                     errors.append("La edad debe estar entre 1 y 120 años")
-            
+
             # Validar peso (opcional, pero si se ingresa debe ser válido)
             if paciente_peso:
-                try:
+                if _WEIGHT_RE.fullmatch(paciente_peso) is None:
+                    errors.append("El peso debe ser un número válido")
+                else:
                     peso_num = float(paciente_peso)
                     if peso_num < 30 or peso_num > 350:
                         errors.append("El peso debe estar entre 30 y 350 kg")
-                except ValueError:
-                    errors.append("El peso debe ser un número válido")
             
             if errors:
                 for error in errors:
@@ -377,8 +501,77 @@ def render_pre_diagnosis_form(user):
                 st.rerun()
 
 
+def _precompute_extra_gradcams(cache, analysis_id, model, img_array, indices, class_names):
+    """Genera los Grad-CAM del Top 2-5 en segundo plano (corre en el pool)"""
+    from utils.activation_maps import generate_gradcam_for_class
+
+    for idx in indices:
+        key = (analysis_id, int(idx))
+        if key in cache:
+            continue
+        try:
+            heatmap, overlay, _ = generate_gradcam_for_class(
+                model, img_array, int(idx), class_names
+            )
+            cache[key] = overlay
+        except Exception as e:
+            # Falla silenciosa: el botón cae al cálculo síncrono
+            print(f"⚠️ Error precalculando Grad-CAM ({idx}): {str(e)}")
+
+
+@st.fragment
+def _extra_gradcams(results, top_5_indices):
+    """Expander de Grad-CAM para Top 2-5 (fragmento independiente)"""
+    predictions = results['predictions']
+    class_names = results['class_names']
+    class_names_es = results.get('class_names_es') or [translate_pathology(n) for n in class_names]
+
+    with st.expander("🔍 Ver Grad-CAM de otras predicciones (Top 2-5)"):
+        st.info("💡 Genera mapas de activación para las otras predicciones del Top 5")
+
+        # Solo mostrar si hay imagen original guardada
+        if 'original_image' in results:
+            model = st.session_state.get('model')
+
+            if model is not None:
+                from utils.activation_maps import generate_gradcam_for_class
+
+                for i, idx in enumerate(top_5_indices[1:5], start=2):  # Top 2-5
+                    name_en = class_names[idx]
+                    name_es = class_names_es[idx]
+                    prob = predictions[idx]
+
+                    if st.button(f"Generar Grad-CAM para {name_es} ({prob*100:.1f}%)", key=f"gradcam_{idx}"):
+                        # Primero el precalculado en segundo plano, si llegó
+                        cache_key = (results['analysis_id'], int(idx))
+                        overlay = st.session_state.get('gradcam_cache', {}).get(cache_key)
+
+                        if overlay is not None:
+                            st.image(overlay, caption=f"Grad-CAM: {name_es}", width="content")
+                        else:
+                            with st.spinner(f"Generando Grad-CAM para {name_es}..."):
+                                try:
+                                    # El array se reconstruye solo al hacer clic
+                                    # (y queda cacheado para el resto de botones)
+                                    img_array = _preprocessed_array(
+                                        results['analysis_id'], results['original_image']
+                                    )
+                                    heatmap, overlay, _ = generate_gradcam_for_class(
+                                        model, img_array, idx, class_names
+                                    )
+                                    st.image(overlay, caption=f"Grad-CAM: {name_es}", width="content")
+                                except Exception as e:
+                                    st.error(f"Error generando Grad-CAM: {str(e)}")
+            else:
+                st.warning("⚠️ El modelo no está disponible para generar Grad-CAM adicionales")
+        else:
+            st.warning("⚠️ Los datos de imagen no están disponibles. Realiza un nuevo análisis para usar esta función.")
+
+
+@st.fragment
 def show_results(results):
-    """Muestra los resultados del análisis"""
+    """Muestra los resultados del análisis (fragmento: los widgets internos
+    no re-ejecutan toda la página)"""
     
     st.markdown("---")
     st.markdown("## 📊 Resultados del Análisis")
@@ -405,10 +598,12 @@ def show_results(results):
     # Ordenar predicciones
     predictions = results['predictions']
     class_names = results['class_names']
-    
-    sorted_indices = np.argsort(predictions)[::-1]
-    top_5_indices = sorted_indices[:5]
-    
+    class_names_es = results.get('class_names_es') or [translate_pathology(n) for n in class_names]
+
+    top_5_indices = results.get('top_5_indices')
+    if top_5_indices is None:
+        top_5_indices = _top_k_indices(predictions)
+
     # Función para determinar nivel de riesgo
     def get_risk_level(probability):
         """Retorna emoji, texto y color según el porcentaje"""
@@ -422,27 +617,29 @@ def show_results(results):
         else:
             return "🔴", "MUY ALTO", "#e74c3c"
     
-    # Mostrar top 5 en cards (lógica de thresholds se mantiene para uso interno)
+    # Mostrar top 5 en cards (lógica de thresholds se mantiene para uso interno).
+    # Las 5 cards se concatenan en un solo st.markdown: un solo delta por
+    # rerun en lugar de cinco
+    html_parts = []
     for i, idx in enumerate(top_5_indices):
         prob = predictions[idx]
         name_en = class_names[idx]  # Nombre en inglés (del modelo)
-        name_es = translate_pathology(name_en)  # Traducir a español
-        
+        name_es = class_names_es[idx]  # Traducción precomputada
+
         # Lógica de detección (para uso interno/comparativas, no se muestra en UI)
         threshold = thresholds.get(name_en, 0.5)
         is_detected = prob >= threshold  # Se guarda para comparativas
-        
+
         # Emoji según ranking
         emojis = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"]
         emoji = emojis[i]
-        
+
         # Obtener nivel de riesgo
         risk_emoji, risk_text, risk_color = get_risk_level(prob)
-        
-        # Card con definición técnica para el #1
+
         if i == 0:
             # Card destacada para Top 1
-            st.markdown(f"""
+            html_parts.append(f"""
             <div style="background-color: #e3f2fd; padding: 1.5rem; border-radius: 10px; border-left: 5px solid #1f77b4; margin-bottom: 1rem;">
                 <div style="display: flex; align-items: center; margin-bottom: 0.5rem;">
                     <div style="font-size: 2rem; margin-right: 1rem;">{emoji}</div>
@@ -455,15 +652,10 @@ def show_results(results):
                     </div>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
-            
-            # Obtener y mostrar definición técnica (usar nombre en inglés para buscar)
-            definition = get_technical_definition(name_en)
-            if definition:
-                st.info(f"📚 **Definición Técnica:** {definition}")
+            """)
         else:
             # Cards normales para Top 2-5
-            st.markdown(f"""
+            html_parts.append(f"""
             <div style="background-color: #f0f2f6; padding: 1rem; border-radius: 10px; margin-bottom: 0.5rem;">
                 <div style="display: flex; justify-content: space-between; align-items: center;">
                     <div style="display: flex; align-items: center;">
@@ -476,40 +668,20 @@ def show_results(results):
                     </div>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
+
+    st.markdown("".join(html_parts), unsafe_allow_html=True)
+
+    # Obtener y mostrar definición técnica del Top 1 (buscar por nombre en inglés)
+    definition = get_technical_definition(class_names[top_5_indices[0]])
+    if definition:
+        st.info(f"📚 **Definición Técnica:** {definition}")
     
-    # Botón para ver Grad-CAM de otras predicciones
+    # Botón para ver Grad-CAM de otras predicciones (fragmento propio:
+    # cada clic solo re-ejecuta el expander, no toda la página)
     st.markdown("---")
-    with st.expander("🔍 Ver Grad-CAM de otras predicciones (Top 2-5)"):
-        st.info("💡 Genera mapas de activación para las otras predicciones del Top 5")
-        
-        # Solo mostrar si hay imagen preprocesada guardada
-        if 'img_array' in results:
-            img_array = results['img_array']
-            model = st.session_state.get('model')
-            
-            if model is not None:
-                from utils.activation_maps import generate_gradcam_for_class
-                
-                for i, idx in enumerate(top_5_indices[1:5], start=2):  # Top 2-5
-                    name_en = class_names[idx]
-                    name_es = translate_pathology(name_en)
-                    prob = predictions[idx]
-                    
-                    if st.button(f"Generar Grad-CAM para {name_es} ({prob*100:.1f}%)", key=f"gradcam_{idx}"):
-                        with st.spinner(f"Generando Grad-CAM para {name_es}..."):
-                            try:
-                                heatmap, overlay, _ = generate_gradcam_for_class(
-                                    model, img_array, idx, class_names
-                                )
-                                st.image(overlay, caption=f"Grad-CAM: {name_es}", width="content")
-                            except Exception as e:
-                                st.error(f"Error generando Grad-CAM: {str(e)}")
-            else:
-                st.warning("⚠️ El modelo no está disponible para generar Grad-CAM adicionales")
-        else:
-            st.warning("⚠️ Los datos de imagen no están disponibles. Realiza un nuevo análisis para usar esta función.")
-    
+    _extra_gradcams(results, top_5_indices)
+
     st.markdown("---")
     
     # Verificación de pronóstico (si existe)
@@ -519,54 +691,33 @@ def show_results(results):
         top_class_es = translate_pathology(top_class_en)  # Traducir a español
         
         st.markdown("### ✅ Verificación de Pronóstico")
-        
-        # Función para normalizar texto (quitar acentos, minúsculas, espacios)
-        def normalize_text(text):
-            """Normaliza texto: quita acentos, convierte a minúsculas, quita espacios"""
-            # Quitar acentos
-            text = unicodedata.normalize('NFD', text)
-            text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
-            # Minúsculas y quitar espacios/guiones
-            text = text.lower().replace(' ', '').replace('_', '').replace('-', '')
-            return text
-        
+
+        # Pares (inglés, español) normalizados, precomputados al analizar
+        norm_names = results.get('norm_names') or [
+            (_normalize_text(en), _normalize_text(es))
+            for en, es in zip(class_names, class_names_es)
+        ]
+
         # Normalizar el pronóstico ingresado por el usuario
-        pronostico_normalizado = normalize_text(pronostico_real)
-        
-        # Normalizar el top 1 en ambos idiomas
-        top_class_en_norm = normalize_text(top_class_en)
-        top_class_es_norm = normalize_text(top_class_es)
-        
-        # Verificar si coincide (comparar con inglés Y español)
-        acerto = (pronostico_normalizado in top_class_en_norm or 
-                  top_class_en_norm in pronostico_normalizado or
-                  pronostico_normalizado in top_class_es_norm or 
-                  top_class_es_norm in pronostico_normalizado)
-        
+        pronostico_normalizado = _normalize_text(pronostico_real)
+
+        def _matches(idx):
+            """Coincidencia bidireccional con el nombre normalizado en ambos idiomas"""
+            en_norm, es_norm = norm_names[idx]
+            return (pronostico_normalizado in en_norm or
+                    en_norm in pronostico_normalizado or
+                    pronostico_normalizado in es_norm or
+                    es_norm in pronostico_normalizado)
+
+        # Verificar si coincide con el top 1 (comparar con inglés Y español)
+        acerto = _matches(int(top_5_indices[0]))
+
         if acerto:
             st.success(f"🎯 **¡ToraxIA acertó!** El pronóstico real '{pronostico_real}' coincide con la predicción principal: **{top_class_es}** ({top_class_en}).")
         else:
-            # Verificar si está en top 5
-            predictions = results['predictions']
-            class_names = results['class_names']
-            sorted_indices = np.argsort(predictions)[::-1]
-            top_5_indices = sorted_indices[:5]
-            
-            top_5_names_en = [class_names[idx] for idx in top_5_indices]
-            top_5_names_es = [translate_pathology(name) for name in top_5_names_en]
-            
-            # Verificar con top 5 (tanto inglés como español)
-            en_top_5 = False
-            for name_en, name_es in zip(top_5_names_en, top_5_names_es):
-                name_en_norm = normalize_text(name_en)
-                name_es_norm = normalize_text(name_es)
-                if (pronostico_normalizado in name_en_norm or 
-                    name_en_norm in pronostico_normalizado or
-                    pronostico_normalizado in name_es_norm or 
-                    name_es_norm in pronostico_normalizado):
-                    en_top_5 = True
-                    break
-            
+            # Verificar con el resto del top 5 (índices ya calculados arriba)
+            en_top_5 = any(_matches(int(idx)) for idx in top_5_indices[1:])
+
             if en_top_5:
                 st.warning(f"⚠️ El pronóstico real '{pronostico_real}' está en el Top 5, pero no es la predicción principal (que es **{top_class_es}**).")
             else:
@@ -577,25 +728,17 @@ def show_results(results):
     # Tabla completa de probabilidades
     st.markdown("### 📋 Tabla Completa de Probabilidades")
     
-    import pandas as pd
-    
-    # Traducir nombres de patologías a español
-    class_names_es = [translate_pathology(name) for name in class_names]
-    
-    # Crear lista de niveles de riesgo
-    niveles = [get_risk_level(prob)[1] for prob in predictions]  # [1] es el texto del nivel
-    
-    df = pd.DataFrame({
-        'Patología': class_names_es,  # Usar nombres en español
-        'Probabilidad': predictions,
-        'Nivel': niveles
-    })
-    
-    df = df.sort_values('Probabilidad', ascending=False).reset_index(drop=True)
-    df['Probabilidad'] = df['Probabilidad'].apply(lambda x: f"{x*100:.2f}%")
-    
+    # Construir la tabla ordenada sin pandas: st.dataframe acepta un dict
+    # y evitamos el import y el apply fila a fila en cada rerun
+    order = np.argsort(predictions)[::-1]
+    table = {
+        'Patología': [class_names_es[i] for i in order],  # Usar nombres en español
+        'Probabilidad': [f"{predictions[i]*100:.2f}%" for i in order],
+        'Nivel': [get_risk_level(predictions[i])[1] for i in order]  # [1] es el texto del nivel
+    }
+
     st.dataframe(
-        df,
+        table,
         width="content",
         hide_index=False,
         column_config={
@@ -625,32 +768,27 @@ def show_results(results):
     
     with col1:
         try:
-            from utils.pdf_generator import generate_report
-            from config import REPORTS_DIR
-            
-            # Generar nombre único para el PDF
+            # El PDF se genera una sola vez por análisis (cacheado);
+            # los reruns posteriores reutilizan los bytes
             pdf_filename = f"{results['analysis_id']}_report.pdf"
-            pdf_path = REPORTS_DIR / pdf_filename
-            
-            # Generar PDF
-            pdf_bytes = generate_report(results, pdf_path)
-            
-            # Botón de descarga directo
+
             st.download_button(
                 label="📄 Descargar Reporte PDF",
-                data=pdf_bytes,
+                data=_build_pdf(results['analysis_id'], results),
                 file_name=pdf_filename,
                 mime="application/pdf",
                 type="primary"
             )
-            
+
         except Exception as e:
             st.error(f"❌ Error generando PDF: {str(e)}")
     
     with col2:
         if st.button("💾 Guardar en Historial"):
             save_to_database(results)
-    
+
+        _render_save_status(results)
+
     with col3:
         if st.button("🔄 Nuevo Análisis"):
             # Limpiar resultados y formulario
@@ -660,52 +798,82 @@ def show_results(results):
                 del st.session_state.form_completed
             if 'form_data' in st.session_state:
                 del st.session_state.form_data
-            st.rerun()
+            # Rerun completo: hay que salir del fragmento de resultados
+            st.rerun(scope="app")
 
 
-def get_technical_definition(pathology_name: str) -> str:
-    """Obtiene la definición técnica de una patología desde Supabase"""
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_definitions() -> dict:
+    """Obtiene todas las definiciones técnicas en un dict (cacheado 1h)"""
     try:
         from services.auth import get_supabase_client
         supabase = get_supabase_client()
-        
-        # Buscar definición
-        result = supabase.table('pathology_definitions').select('technical_definition').eq('pathology_name', pathology_name).execute()
-        
-        if result.data:
-            return result.data[0]['technical_definition']
-        return None
-        
+
+        result = supabase.table('pathology_definitions').select('pathology_name,technical_definition').execute()
+        return {d['pathology_name']: d['technical_definition'] for d in (result.data or ())}
+
     except Exception as e:
-        st.error(f"Error obteniendo definición: {str(e)}")
-        return None
+        # No romper el render por una falla transitoria; se reintenta al vencer el TTL
+        print(f"⚠️ Error obteniendo definiciones: {str(e)}")
+        return {}
 
 
-def save_to_database(results):
-    """Guarda el análisis en Supabase (solo si hay internet)"""
+def get_technical_definition(pathology_name: str) -> str:
+    """Obtiene la definición técnica de una patología (cacheada en memoria)"""
+    return _load_definitions().get(pathology_name)
+
+
+def _do_save(results, form_data, user_id):
+    """Guarda en Supabase (corre en un hilo del pool, sin contexto de
+    Streamlit: todo lo que venga de session_state llega por argumento)"""
     from services.database import save_analysis_to_database
-    from utils.connectivity import check_internet_connection
-    
-    # Verificar conexión primero
-    if not check_internet_connection():
-        st.error("❌ No hay conexión a internet. No se puede guardar el análisis en la base de datos.")
-        st.info("💡 El análisis se puede descargar como PDF, pero no se guardará en tu historial hasta que tengas conexión.")
-        return
-    
-    # Obtener datos del formulario
+
+    return save_analysis_to_database(results, form_data, user_id=user_id)
+
+
+def save_to_database(results):
+    """Lanza el guardado del análisis en segundo plano (no bloquea la UI)"""
     form_data = results.get('form_data', {})
-    
+
     if not form_data:
         st.error("❌ No se encontraron datos del formulario. No se puede guardar el análisis.")
         return
-    
-    # Mostrar spinner mientras se guarda
-    with st.spinner("💾 Guardando análisis en la base de datos..."):
-        success, message = save_analysis_to_database(results, form_data)
-    
+
+    # Resolver el usuario en el hilo del script: los hilos del pool no
+    # tienen ScriptRunContext y no pueden leer session_state
+    user = get_current_user()
+    if not user:
+        st.error("❌ Sesión no disponible. Inicia sesión de nuevo para guardar el análisis.")
+        return
+
+    futures = st.session_state.setdefault('save_futures', {})
+    prev = futures.get(results['analysis_id'])
+    if prev is None or prev.done():
+        # Sin guardado en curso para este análisis: lanzar uno nuevo
+        futures[results['analysis_id']] = _EXECUTOR.submit(
+            _do_save, results, form_data, user['id']
+        )
+
+
+def _render_save_status(results):
+    """Muestra el estado del guardado en segundo plano, si hay uno en curso"""
+    future = st.session_state.get('save_futures', {}).get(results['analysis_id'])
+    if future is None:
+        return
+
+    if not future.done():
+        st.info("💾 Guardando análisis en segundo plano... puedes seguir revisando los resultados.")
+        time.sleep(0.5)
+        st.rerun(scope="fragment")
+        return
+
+    try:
+        success, message = future.result()
+    except Exception as e:
+        success, message = False, f"Error al guardar: {str(e)}"
+
     if success:
         st.success(message)
-        st.balloons()
         st.info("📊 El análisis ahora aparecerá en tu historial personal y en la actividad reciente.")
     else:
         st.error(message)
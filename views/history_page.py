@@ -3,15 +3,117 @@ Página de Historial Personal
 Muestra los análisis guardados del usuario actual
 """
 import streamlit as st
+import collections
+import functools
+import heapq
+import operator
 from datetime import datetime
-from services.database import get_user_analyses
+from services.database import get_user_analyses, get_analysis_detail
 from services.auth import get_current_user
 from utils.translations import translate_pathology
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import numpy as np
 from PIL import Image
 
+# Análisis por página en el historial
+_PAGE_SIZE = 10
+
+# Constantes de presentación de las cards (construidas una sola vez,
+# no en cada rerun por cada card)
+_RANK_EMOJI = ("🥇", "🥈", "🥉", "4️⃣", "5️⃣")
+
+# Umbrales de color para la probabilidad principal (rojo/naranja/verde)
+_PROB_COLORS = (
+    (0.7, "#d32f2f"),
+    (0.4, "#f57c00"),
+    (0.0, "#388e3c"),
+)
+
+
+# Campos del encabezado de una card, extraídos en una sola pasada
+_HEADER_FIELDS = operator.itemgetter(
+    'timestamp', 'paciente_nombre', 'paciente_apellido', 'paciente_ci',
+    'paciente_edad', 'paciente_sexo', 'top_prediction', 'top_probability',
+    'acerto_toraxia', 'pronostico_real',
+)
+
+
+def _get_risk_level(probability):
+    """Retorna emoji, texto y color según el porcentaje"""
+    prob_pct = probability * 100
+    if prob_pct < 25:
+        return "🟢", "BAJO", "#27ae60"
+    elif prob_pct < 50:
+        return "🟡", "MODERADO", "#f1c40f"
+    elif prob_pct < 75:
+        return "🟠", "ALTO", "#e67e22"
+    else:
+        return "🔴", "MUY ALTO", "#e74c3c"
+
+# Sesión HTTP compartida: reutiliza conexiones TCP/TLS entre descargas
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# Pool para descargar las dos imágenes de un análisis en paralelo
+_DOWNLOAD_POOL = ThreadPoolExecutor(max_workers=2)
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_ts(timestamp: str) -> str:
+    """Formatea un timestamp ISO a dd/mm/aaaa hh:mm (cacheado por string)"""
+    try:
+        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        return dt.strftime("%d/%m/%Y %H:%M")
+    except:
+        return timestamp
+
+
+@functools.lru_cache(maxsize=64)
+def _fetch_image_cached(url: str):
+    """Descarga y decodifica una imagen de Storage (LRU acotada por URL).
+
+    Las fallas (de red o HTTP) se propagan para que lru_cache no las
+    memorice; un reintento posterior vuelve a descargar.
+    """
+    response = _SESSION.get(url, timeout=10)
+    # Un 4xx/5xx también debe escapar del caché, no quedar como None
+    response.raise_for_status()
+    img = Image.open(BytesIO(response.content))
+    # draft() deja que el decodificador JPEG salte a una escala menor
+    # y thumbnail() remata al tamaño final: el PDF no necesita más de
+    # 1024px y así no se decodifica ni copia la resolución completa
+    img.draft('RGB', (1024, 1024))
+    img.thumbnail((1024, 1024), Image.BILINEAR)
+    # Se retorna la imagen PIL tal cual: el generador de PDF la
+    # consume directamente y así se evita la copia W*H*3 de numpy
+    return img
+
+
+def _thumb_url(url, width: int = 400):
+    """URL de miniatura vía transformación de Supabase Storage.
+
+    El endpoint render/image redimensiona en el servidor, así el navegador
+    no descarga la radiografía a resolución completa solo para mostrarla
+    como vista previa. El PDF sigue usando la URL original.
+    """
+    if not url or '/object/public/' not in url:
+        return url
+    return (url.replace('/object/public/', '/render/image/public/', 1)
+            + f"?width={width}&resize=contain")
+
+
+def _fetch_image(url):
+    """Obtiene una imagen por URL; regenerar el mismo PDF no vuelve a la red"""
+    if not url:
+        return None
+    try:
+        return _fetch_image_cached(url)
+    except Exception:
+        return None
+
 
 def generate_pdf_from_history(analysis: dict) -> bytes:
     """
@@ -27,28 +129,16 @@ def generate_pdf_from_history(analysis: dict) -> bytes:
     try:
         from utils.pdf_generator import generate_report
         
-        # Descargar imágenes desde URLs
-        original_image = None
-        overlay_image = None
-        
+        # Las URLs llegan ya resueltas en la fila de la BD (bucket público:
+        # no hay que firmar ni pedir URLs por imagen, cero viajes extra)
         original_url = analysis.get('original_image_url')
         overlay_url = analysis.get('overlay_image_url')
-        
-        if original_url:
-            try:
-                response = requests.get(original_url, timeout=10)
-                if response.status_code == 200:
-                    original_image = np.array(Image.open(BytesIO(response.content)))
-            except:
-                pass
-        
-        if overlay_url:
-            try:
-                response = requests.get(overlay_url, timeout=10)
-                if response.status_code == 200:
-                    overlay_image = np.array(Image.open(BytesIO(response.content)))
-            except:
-                pass
+
+        # Descargar ambas imágenes en paralelo (son independientes)
+        orig_future = _DOWNLOAD_POOL.submit(_fetch_image, original_url)
+        over_future = _DOWNLOAD_POOL.submit(_fetch_image, overlay_url)
+        original_image = orig_future.result()
+        overlay_image = over_future.result()
         
         # Preparar datos para el generador de PDF
         predictions_dict = analysis.get('predictions_json', {})
@@ -87,6 +177,12 @@ def generate_pdf_from_history(analysis: dict) -> bytes:
         print(f"❌ Error generando PDF: {str(e)}")
         return None
 
+@st.cache_data(ttl=600, show_spinner="Generando PDF...")
+def _cached_pdf(analysis_id: str, _analysis: dict) -> bytes:
+    """PDF del historial cacheado por id (el dict no se hashea)"""
+    return generate_pdf_from_history(_analysis)
+
+
 def render_history_page():
     """Renderiza la página de historial personal"""
     
@@ -111,68 +207,96 @@ def render_history_page():
     
     st.markdown("---")
     
-    # Obtener análisis del usuario
+    # Obtener solo la página actual de análisis (la BD hace el recorte)
+    page = st.session_state.get('history_page', 0)
+
     with st.spinner("📥 Cargando historial..."):
-        analyses = get_user_analyses(user_id, limit=100)
-    
+        analyses = get_user_analyses(
+            user_id, limit=_PAGE_SIZE, offset=page * _PAGE_SIZE,
+            search_ci=search_ci or None
+        )
+
     if not analyses:
-        st.info("📭 No tienes análisis guardados aún.")
-        st.markdown("💡 Realiza un análisis y guárdalo para verlo aquí.")
-        return
-    
-    # Filtrar por cédula si se ingresó
-    if search_ci:
-        analyses = [a for a in analyses if search_ci in a.get('paciente_ci', '')]
-        
-        if not analyses:
+        if page > 0:
+            # Página vacía (p. ej. tras eliminar): volver a la anterior
+            st.session_state['history_page'] = page - 1
+            st.rerun()
+        if search_ci:
             st.warning(f"⚠️ No se encontraron análisis para la cédula: {search_ci}")
-            return
-    
+        else:
+            st.info("📭 No tienes análisis guardados aún.")
+            st.markdown("💡 Realiza un análisis y guárdalo para verlo aquí.")
+        return
+
     # Mostrar total de análisis
-    st.markdown(f"### 📋 Total de Análisis: **{len(analyses)}**")
-    
+    st.markdown(f"### 📋 Mostrando **{len(analyses)}** análisis (página {page + 1})")
+
     if search_ci:
         st.caption(f"Mostrando resultados para CI: {search_ci}")
-    
+
     st.markdown("---")
-    
+
+    # Formatear la fecha una sola vez por fila (fromisoformat + strftime
+    # en cada rerun de cada card era trabajo repetido)
+    for a in analyses:
+        a['_fecha_str'] = _format_ts(a.get('timestamp', ''))
+
+    # Traducir cada código de patología una sola vez por página en lugar
+    # de una vez por aparición dentro de cada card
+    # (los Top-5 de las cards abiertas usan el fallback a translate_pathology,
+    # que ya está cacheado con lru_cache)
+    codes = {a.get('top_prediction') for a in analyses if a.get('top_prediction')}
+    translations = {c: translate_pathology(c) for c in codes}
+
     # Mostrar análisis en cards expandibles
     for i, analysis in enumerate(analyses):
-        render_analysis_card(analysis, i)
+        render_analysis_card(analysis, i, translations)
 
+    # Navegación entre páginas
+    st.markdown("---")
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
 
-def render_analysis_card(analysis: dict, index: int):
-    """Renderiza una tarjeta de análisis"""
-    
-    # Extraer datos
-    timestamp = analysis.get('timestamp', '')
-    paciente_nombre = analysis.get('paciente_nombre', 'N/A')
-    paciente_apellido = analysis.get('paciente_apellido', 'N/A')
-    paciente_ci = analysis.get('paciente_ci', 'N/A')
-    paciente_edad = analysis.get('paciente_edad', 'N/A')
-    paciente_sexo = analysis.get('paciente_sexo', 'N/A')
+    with col_prev:
+        if page > 0 and st.button("◀ Anterior", key="history_prev"):
+            st.session_state['history_page'] = page - 1
+            st.rerun()
+
+    with col_page:
+        st.caption(f"Página {page + 1}")
+
+    with col_next:
+        if len(analyses) == _PAGE_SIZE and st.button("Siguiente ▶", key="history_next"):
+            st.session_state['history_page'] = page + 1
+            st.rerun()
+
+
+def render_analysis_card(analysis: dict, index: int, translations: dict = None):
+    """Renderiza una tarjeta de análisis
+
+    Args:
+        analysis: Diccionario con los datos del análisis
+        index: Posición de la card en la página (para keys de widgets)
+        translations: Traducciones código -> español precalculadas por página
+    """
+    if translations is None:
+        translations = {}
     
-    top_prediction_en = analysis.get('top_prediction', 'N/A')
-    top_prediction_es = translate_pathology(top_prediction_en)
-    top_probability = analysis.get('top_probability', 0)
+    # Extraer datos del encabezado en una sola pasada (los campos que
+    # falten en la fila ligera rinden 'N/A' vía defaultdict)
+    analysis = collections.defaultdict(lambda: 'N/A', analysis)
+    (timestamp, paciente_nombre, paciente_apellido, paciente_ci,
+     paciente_edad, paciente_sexo, top_prediction_en, top_probability,
+     acerto_toraxia, pronostico_real) = _HEADER_FIELDS(analysis)
+
+    top_prediction_es = translations.get(top_prediction_en) or translate_pathology(top_prediction_en)
+    if not isinstance(top_probability, (int, float)):
+        top_probability = 0
     
-    acerto_toraxia = analysis.get('acerto_toraxia')
-    pronostico_real = analysis.get('pronostico_real')
-    
-    # Formatear fecha
-    try:
-        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-        fecha_str = dt.strftime("%d/%m/%Y %H:%M")
-    except:
-        fecha_str = timestamp
+    # Formatear fecha (estampada tras el fetch; fallback por si falta)
+    fecha_str = analysis.get('_fecha_str') or _format_ts(timestamp)
     
     # Determinar color según probabilidad
-    if top_probability >= 0.7:
-        prob_color = "#d32f2f"  # Rojo (alta probabilidad)
-    elif top_probability >= 0.4:
-        prob_color = "#f57c00"  # Naranja (media)
-    else:
-        prob_color = "#388e3c"  # Verde (baja)
+    prob_color = next(c for t, c in _PROB_COLORS if top_probability >= t)
     
     # Emoji de verificación
     if acerto_toraxia is True:
@@ -191,26 +315,49 @@ def render_analysis_card(analysis: dict, index: int):
     if acerto_toraxia is not None:
         expander_title += f" | {verificacion_emoji}"
     
-    with st.expander(expander_title, expanded=False):
-        
+    # Cabecera con botón de despliegue: el cuerpo de un st.expander se
+    # ejecuta aunque esté colapsado, así solo las cards abiertas pagan
+    # su renderizado (y las descargas de imágenes remotas)
+    open_key = f"open_{analysis.get('id', index)}"
+    expanded = st.session_state.get(open_key, False)
+
+    arrow = "🔽" if expanded else "▶️"
+    if st.button(f"{arrow} {expander_title}", key=f"toggle_{index}", width="content"):
+        st.session_state[open_key] = not expanded
+        st.rerun()
+
+    if expanded:
+        # La lista solo trae las columnas del encabezado; la fila completa
+        # (predicciones, comentarios, URLs) se pide al abrir la card
+        detail = get_analysis_detail(analysis.get('id'))
+        if detail:
+            analysis = {**analysis, **detail}
+        pronostico_real = analysis.get('pronostico_real')
+
         # Información del paciente
         col1, col2 = st.columns(2)
         
         with col1:
-            st.markdown("#### 👤 Datos del Paciente")
-            st.write(f"**Nombre:** {paciente_nombre} {paciente_apellido}")
-            st.write(f"**CI:** {paciente_ci}")
-            st.write(f"**Edad:** {paciente_edad} años")
-            st.write(f"**Sexo:** {paciente_sexo}")
-            
+            # Un solo st.markdown por bloque de solo lectura: cada llamada
+            # a st.write/st.markdown es un elemento aparte en el frontend
+            paciente_md = [
+                "#### 👤 Datos del Paciente",
+                f"**Nombre:** {paciente_nombre} {paciente_apellido}",
+                f"**CI:** {paciente_ci}",
+                f"**Edad:** {paciente_edad} años",
+                f"**Sexo:** {paciente_sexo}",
+            ]
             if analysis.get('paciente_peso'):
-                st.write(f"**Peso:** {analysis['paciente_peso']} kg")
-        
+                paciente_md.append(f"**Peso:** {analysis['paciente_peso']} kg")
+            st.markdown("  \n".join(paciente_md))
+
         with col2:
-            st.markdown("#### 🎓 Datos Académicos")
-            st.write(f"**Estudiante:** {analysis.get('academico_nombre')} {analysis.get('academico_apellido')}")
-            st.write(f"**CI:** {analysis.get('academico_ci')}")
-            st.write(f"**Área:** {analysis.get('academico_area', 'N/A').capitalize()}")
+            st.markdown("  \n".join([
+                "#### 🎓 Datos Académicos",
+                f"**Estudiante:** {analysis.get('academico_nombre')} {analysis.get('academico_apellido')}",
+                f"**CI:** {analysis.get('academico_ci')}",
+                f"**Área:** {analysis.get('academico_area', 'N/A').capitalize()}",
+            ]))
         
         st.markdown("---")
         
@@ -226,14 +373,14 @@ def render_analysis_card(analysis: dict, index: int):
             with img_col1:
                 if original_url:
                     st.markdown("**Radiografía Original:**")
-                    st.image(original_url, width="content")
+                    st.image(_thumb_url(original_url), width="content")
                 else:
                     st.info("📷 Imagen original no disponible")
             
             with img_col2:
                 if overlay_url:
                     st.markdown("**Mapa de Activación (Grad-CAM):**")
-                    st.image(overlay_url, width="content")
+                    st.image(_thumb_url(overlay_url), width="content")
                 else:
                     st.info("🔥 Overlay no disponible")
             
@@ -271,33 +418,20 @@ def render_analysis_card(analysis: dict, index: int):
             st.markdown("#### 📊 Top 5 Predicciones")
             
             predictions_dict = analysis['predictions_json']
+
+            # Top 5 sin ordenar el diccionario completo
+            sorted_predictions = heapq.nlargest(
+                5, predictions_dict.items(), key=lambda x: x[1]
+            )
             
-            # Función para determinar nivel de riesgo
-            def get_risk_level(probability):
-                """Retorna emoji, texto y color según el porcentaje"""
-                prob_pct = probability * 100
-                if prob_pct < 25:
-                    return "🟢", "BAJO", "#27ae60"
-                elif prob_pct < 50:
-                    return "🟡", "MODERADO", "#f1c40f"
-                elif prob_pct < 75:
-                    return "🟠", "ALTO", "#e67e22"
-                else:
-                    return "🔴", "MUY ALTO", "#e74c3c"
-            
-            # Ordenar por probabilidad
-            sorted_predictions = sorted(
-                predictions_dict.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:5]
-            
+            # Un solo st.markdown para las 5 filas en lugar de uno por fila
+            top5_parts = []
             for rank, (pathology_en, prob) in enumerate(sorted_predictions, 1):
-                pathology_es = translate_pathology(pathology_en)
-                emoji = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"][rank-1]
-                risk_emoji, risk_text, risk_color = get_risk_level(prob)
-                
-                st.markdown(f"""
+                pathology_es = translations.get(pathology_en) or translate_pathology(pathology_en)
+                emoji = _RANK_EMOJI[rank-1]
+                risk_emoji, risk_text, risk_color = _get_risk_level(prob)
+
+                top5_parts.append(f"""
                 <div style="background-color: #f0f2f6; padding: 0.5rem 1rem; border-radius: 5px; margin-bottom: 0.3rem;">
                     <div style="display: flex; justify-content: space-between; align-items: center;">
                         <div>
@@ -311,7 +445,9 @@ def render_analysis_card(analysis: dict, index: int):
                         </div>
                     </div>
                 </div>
-                """, unsafe_allow_html=True)
+                """)
+
+            st.markdown("".join(top5_parts), unsafe_allow_html=True)
         
         st.markdown("---")
         
@@ -319,18 +455,25 @@ def render_analysis_card(analysis: dict, index: int):
         col1, col2 = st.columns(2)
         
         with col1:
-            # Generar y descargar PDF desde historial
-            pdf_bytes = generate_pdf_from_history(analysis)
-            if pdf_bytes:
-                st.download_button(
-                    label="📥 Descargar PDF",
-                    data=pdf_bytes,
-                    file_name=f"ToraxIA_Report_{analysis.get('id', 'unknown')[:8]}.pdf",
-                    mime="application/pdf",
-                    key=f"pdf_download_{index}"
-                )
-            else:
-                st.warning("⚠️ No se pudo generar el PDF")
+            # El PDF (y sus dos descargas de imágenes) solo se genera al
+            # pedirlo; antes se construía para cada card en cada rerun
+            pdf_key = f"pdf_{analysis.get('id', index)}"
+
+            if st.button("📄 Preparar PDF", key=f"prep_{index}"):
+                st.session_state[pdf_key] = _cached_pdf(analysis.get('id'), analysis)
+
+            if pdf_key in st.session_state:
+                pdf_bytes = st.session_state[pdf_key]
+                if pdf_bytes:
+                    st.download_button(
+                        label="📥 Descargar PDF",
+                        data=pdf_bytes,
+                        file_name=f"ToraxIA_Report_{analysis.get('id', 'unknown')[:8]}.pdf",
+                        mime="application/pdf",
+                        key=f"pdf_download_{index}"
+                    )
+                else:
+                    st.warning("⚠️ No se pudo generar el PDF")
         
         with col2:
             # Eliminar con confirmación
@@ -369,6 +512,10 @@ def delete_analysis(analysis_id: str) -> bool:
         supabase = get_supabase_client()
         
         result = supabase.table('analyses').delete().eq('id', analysis_id).execute()
+
+        # Invalidar el historial cacheado para que el borrado se refleje
+        get_user_analyses.clear()
+        get_analysis_detail.clear()
         return True
         
     except Exception as e:
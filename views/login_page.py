@@ -2,14 +2,41 @@
 Página de Login y Registro
 """
 import streamlit as st
-from services.auth import register_user, login_with_persistence
 import re
 
+# Patrones de validación compilados una sola vez al importar (evita la
+# búsqueda en el caché interno de re en cada rerun del formulario)
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NAME_RE = re.compile(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s\-]+$')
+
+# Bloques HTML estáticos de la página, construidos una sola vez al importar
+# (la página se vuelve a ejecutar con cada interacción)
+_SUBHEADER_HTML = '<div class="sub-header">Sistema de Diagnóstico Asistido por IA</div>'
+_FOOTER_HTML = """
+<div style="text-align: center; color: #666; font-size: 0.9rem;">
+    <p>ToraxIA v2.0 - Sistema de Diagnóstico Asistido por IA</p>
+    <p>Desarrollado para uso académico</p>
+</div>
+"""
+
+# Opciones del área de estudio (el lambda anterior reconstruía el dict
+# de etiquetas por cada opción en cada rerun)
+_AREA_OPTIONS = ["radiologia", "medicina", "enfermeria", "otro"]
+_AREA_LABELS = {
+    "radiologia": "Radiología",
+    "medicina": "Medicina",
+    "enfermeria": "Enfermería",
+    "otro": "Otro"
+}
+
 
 def validate_email(email: str) -> bool:
     """Valida formato de email"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    # Prechequeos baratos en C: descartan vacíos y typos obvios (sin @,
+    # sin punto en el dominio) antes de entrar al motor de regex
+    if not email or '@' not in email or '.' not in email.rsplit('@', 1)[-1]:
+        return False
+    return _EMAIL_RE.match(email) is not None
 
 
 def validate_ci(ci: str) -> bool:
@@ -25,8 +52,7 @@ def validate_name(name: str) -> bool:
     if not name or len(name.strip()) < 2:
         return False
     # Permite letras (incluyendo acentos), espacios y guiones
-    pattern = r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s\-]+$'
-    return re.match(pattern, name.strip()) is not None
+    return _NAME_RE.match(name.strip()) is not None
 
 
 def render_login_page():
@@ -37,7 +63,7 @@ def render_login_page():
     with col2:
         st.image("toraxia_logo/toraxia-high-resolution-logo-transparent.png", use_container_width=True)
     
-    st.markdown('<div class="sub-header">Sistema de Diagnóstico Asistido por IA</div>', unsafe_allow_html=True)
+    st.markdown(_SUBHEADER_HTML, unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -63,6 +89,10 @@ def render_login_page():
                     st.error("❌ Email inválido")
                 else:
                     with st.spinner("🔄 Verificando credenciales..."):
+                        # Import diferido: services.auth arrastra el cliente
+                        # de Supabase y bcrypt, que solo hacen falta al enviar
+                        from services.auth import login_with_persistence
+
                         # Usar login_with_persistence para guardar cookie
                         success, user, message = login_with_persistence(email, password)
                         
@@ -80,21 +110,22 @@ def render_login_page():
         st.markdown("### Crear Cuenta Nueva")
         
         with st.form("register_form"):
+            # Un solo par de columnas para las tres filas: los widgets se
+            # apilan dentro de cada columna y queda la misma grilla 2x3,
+            # con dos contenedores menos por rerun
             col1, col2 = st.columns(2)
             with col1:
                 nombre = st.text_input("👤 Nombre", placeholder="Juan")
             with col2:
                 apellido = st.text_input("👤 Apellido", placeholder="Pérez")
-            
+
             # Fila 2: Email y Cédula
-            col1, col2 = st.columns(2)
             with col1:
                 email = st.text_input("📧 Email", placeholder="tu@email.com")
             with col2:
                 ci = st.text_input("🆔 Cédula de Identidad", placeholder="12345678")
-            
+
             # Fila 3: Contraseñas
-            col1, col2 = st.columns(2)
             with col1:
                 password = st.text_input("🔒 Contraseña", type="password", help="Mínimo 8 caracteres")
             with col2:
@@ -103,13 +134,8 @@ def render_login_page():
             # Área de estudio
             area_estudio = st.selectbox(
                 "🎓 Área de Estudio",
-                options=["radiologia", "medicina", "enfermeria", "otro"],
-                format_func=lambda x: {
-                    "radiologia": "Radiología",
-                    "medicina": "Medicina",
-                    "enfermeria": "Enfermería",
-                    "otro": "Otro"
-                }[x]
+                options=_AREA_OPTIONS,
+                format_func=_AREA_LABELS.__getitem__
             )
             
             st.markdown("---")
@@ -120,32 +146,36 @@ def render_login_page():
                 # Validaciones
                 errors = []
                 
-                if not all([nombre, apellido, email, password, password_confirm, ci]):
+                # Con campos vacíos no tiene sentido correr los validadores:
+                # un solo error claro y cero invocaciones de regex
+                if not (nombre and apellido and email and password and password_confirm and ci):
                     errors.append("Por favor completa todos los campos")
-                
-                if not validate_name(nombre):
-                    errors.append("Nombre inválido (solo letras, sin números ni caracteres especiales)")
-                
-                if not validate_name(apellido):
-                    errors.append("Apellido inválido (solo letras, sin números ni caracteres especiales)")
-                
-                if not validate_email(email):
-                    errors.append("Email inválido")
-                
-                if not validate_ci(ci):
-                    errors.append("Cédula inválida (debe contener solo números, 7-8 dígitos)")
-                
-                if len(password) < 8:
-                    errors.append("La contraseña debe tener al menos 8 caracteres")
-                
-                if password != password_confirm:
-                    errors.append("Las contraseñas no coinciden")
+                else:
+                    if not validate_name(nombre):
+                        errors.append("Nombre inválido (solo letras, sin números ni caracteres especiales)")
+
+                    if not validate_name(apellido):
+                        errors.append("Apellido inválido (solo letras, sin números ni caracteres especiales)")
+
+                    if not validate_email(email):
+                        errors.append("Email inválido")
+
+                    if not validate_ci(ci):
+                        errors.append("Cédula inválida (debe contener solo números, 7-8 dígitos)")
+
+                    if len(password) < 8:
+                        errors.append("La contraseña debe tener al menos 8 caracteres")
+
+                    if password != password_confirm:
+                        errors.append("Las contraseñas no coinciden")
                 
                 if errors:
                     for error in errors:
                         st.error(f"❌ {error}")
                 else:
                     with st.spinner("🔄 Creando cuenta..."):
+                        from services.auth import register_user
+
                         success, message = register_user(
                             email=email,
                             password=password,
@@ -165,9 +195,4 @@ def render_login_page():
     
     # Footer
     st.markdown("---")
-    st.markdown("""
-    <div style="text-align: center; color: #666; font-size: 0.9rem;">
-        <p>ToraxIA v2.0 - Sistema de Diagnóstico Asistido por IA</p>
-        <p>Desarrollado para uso académico</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_FOOTER_HTML, unsafe_allow_html=True)